@@ -1,18 +1,44 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import gspread
-from google.oauth2.service_account import Credentials
-import json
+import numpy as np
+import bisect
+import time
 from datetime import datetime, timedelta
-import os
-import io
+
+import data_table
+import geo_assets
+import ingest
+import perf_metrics
+import sheets_access
+import shared_cache
+
+# plotly, gspread and google.oauth2 are imported inside the functions that use them
+# so the page shell renders before they load; serve.py imports them ahead of traffic.
 
 # ---------------------------- CONFIG ----------------------------
-@st.cache_resource
+SHEET_TTL_SECONDS = 3600
+# The shared cache holds sheets for SHEET_TTL_SECONDS; the per-process layer in front
+# of it expires sooner so a stale copy served while Sheets is throttled is retried soon.
+SHEET_LOCAL_TTL_SECONDS = 60
+# Tabs that are still being filled in (today's, and the 2-hourly tab of yesterday,
+# which runs until 06:00 today) are refetched this often instead.
+LIVE_SHEET_TTL_SECONDS = 300
+# Models and figures are keyed on the content hash of their input tabs, so they
+# never go stale; this only bounds how long unused ones stay in the shared cache.
+DERIVED_TTL_SECONDS = 7 * 24 * 3600
+# Part of every derived-model key in the shared cache. Bump it whenever a build_*_model
+# function changes what it returns, so replicas never load models pickled by older code.
+MODEL_VERSION = 1
+# Lock held while one replica batch-fetches days of a monthly spreadsheet.
+BATCH_LOCK_SECONDS = 60
+# Longest date range the multi-day maps animate.
+MAX_ANIMATION_DAYS = 30
+
+@perf_metrics.instrumented_cache("gsheet_client", st.cache_resource)
 def get_gsheet_client():
     """Authenticates and returns a gspread client."""
+    import gspread
+    from google.oauth2.service_account import Credentials
     try:
         scope = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
         creds_dict = dict(st.secrets["gcp_service_account"])
@@ -22,18 +48,17 @@ def get_gsheet_client():
         st.error(f"Authentication failed: {e}")
         return None
 
-@st.cache_resource
+@perf_metrics.instrumented_cache("geojson", st.cache_resource)
 def load_geojson(path):
-    """Loads a GeoJSON file from the specified path."""
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            geojson_data = json.load(f)
+    """Loads normalized GeoJSON for the specified path, preferring the precompiled copy."""
+    geojson_data = geo_assets.read_geojson(path)
+    if geojson_data is not None:
         return geojson_data
     st.error(f"GeoJSON file not found at: {path}")
     return None
 
 # --- Custom CSS for dashboard styling ---
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     /* Hide Streamlit's default header and footer elements for a cleaner view */
     .stApp > header {
@@ -123,7 +148,7 @@ st.markdown("""
 <script>
     document.addEventListener('contextmenu', event => event.preventDefault());
 </script>
-""", unsafe_allow_html=True)
+"""
 
 
 # ---------------------------- RAINFALL CATEGORY LOGIC ----------------------------
@@ -151,32 +176,43 @@ category_ranges = {
     "Exceptional": "> 350 mm"
 }
 
-def classify_rainfall(rainfall):
-    """Classifies rainfall amount into predefined categories."""
-    if pd.isna(rainfall) or rainfall == 0:
-        return "No Rain"
-    elif rainfall > 0 and rainfall <= 2.4:
-        return "Very Light"
-    elif rainfall <= 7.5:
-        return "Light"
-    elif rainfall <= 35.5:
-        return "Moderate"
-    elif rainfall <= 64.4:
-        return "Rather Heavy"
-    elif rainfall <= 124.4:
-        return "Heavy"
-    elif rainfall <= 244.4:
-        return "Very Heavy"
-    elif rainfall <= 350:
-        return "Extremely Heavy"
-    else:
-        return "Exceptional"
-
 ordered_categories = [
     "No Rain", "Very Light", "Light", "Moderate", "Rather Heavy",
     "Heavy", "Very Heavy", "Extremely Heavy", "Exceptional"
 ]
 
+# Upper bound (mm) of each category in ordered_categories, except the open-ended last one.
+# Zero, negative and missing amounts are all "No Rain".
+category_upper_bounds = np.array([0, 2.4, 7.5, 35.5, 64.4, 124.4, 244.4, 350])
+_category_upper_bounds_list = category_upper_bounds.tolist()
+
+def classify_rainfall_codes(values):
+    """Vectorized classify_rainfall: returns indexes into ordered_categories."""
+    values = np.asarray(values, dtype=float)
+    codes = np.searchsorted(category_upper_bounds, values, side="left")
+    return np.where(np.isnan(values) | (values <= 0), 0, codes).astype(np.int8)
+
+def classify_rainfall(rainfall):
+    """Classifies rainfall amount into predefined categories."""
+    if pd.isna(rainfall) or rainfall <= 0:
+        return ordered_categories[0]
+    return ordered_categories[bisect.bisect_left(_category_upper_bounds_list, rainfall)]
+
+district_name_mapping = {
+    "Chhota Udepur": "Chhota Udaipur", "Dangs": "Dang",
+    "Kachchh": "Kutch", "Mahesana": "Mehsana",
+}
+
+time_slot_order = ['06TO08', '08TO10', '10TO12', '12TO14', '14TO16', '16TO18',
+                   '18TO20', '20TO22', '22TO24', '24TO02', '02TO04', '04TO06']
+
+slot_labels = {
+    "06TO08": "6–8 AM", "08TO10": "8–10 AM", "10TO12": "10–12 AM",
+    "12TO14": "12–2 PM", "14TO16": "2–4 PM", "16TO18": "4–6 PM",
+    "18TO20": "6–8 PM", "20TO22": "8–10 PM", "22TO24": "10–12 PM",
+    "24TO02": "12–2 AM", "02TO04": "2–4 AM", "04TO06": "4–6 AM",
+}
+
 
 # ---------------------------- UTILITY FUNCTIONS ----------------------------
 
@@ -186,30 +222,159 @@ def generate_title_from_date(selected_date):
     end_date = selected_date.strftime("%d-%m-%Y")
     return f"24 Hours Rainfall Summary ({start_date} 06:00 AM to {end_date} 06:00 AM)"
 
-@st.cache_data(ttl=3600)
-def load_sheet_data(sheet_name, tab_name):
-    """Loads data from a Google Sheet tab into a DataFrame."""
+def daily_sheet_and_tab(date):
+    """Returns the (spreadsheet, tab) names holding the 24-hour data for a date."""
+    return f"24HR_Rainfall_{date.strftime('%B')}_{date.strftime('%Y')}", f"master24hrs_{date.strftime('%Y-%m-%d')}"
+
+def hourly_sheet_and_tab(date):
+    """Returns the (spreadsheet, tab) names holding the 2-hourly data for a date."""
+    return f"2HR_Rainfall_{date.strftime('%B')}_{date.strftime('%Y')}", f"2hrs_master_{date.strftime('%Y-%m-%d')}"
+
+def sheet_ttl(date):
+    """Returns how long the shared cache may keep the tabs for ``date``."""
+    if date >= datetime.today().date() - timedelta(days=1):
+        return LIVE_SHEET_TTL_SECONDS
+    return SHEET_TTL_SECONDS
+
+def fetch_sheet_tab(client, sheet_name, tab_name, kind, **options):
+    """Fetches a Google Sheet tab and validates it into an ``ingest.Tab``.
+
+    ``options`` are passed to ``sheets_access.fetch_records`` (retry and quota limits).
+    """
+    with perf_metrics.timer("sheets_fetch"):
+        records = sheets_access.fetch_records(client, sheet_name, tab_name, **options)
+    return ingest.ingest(records, kind)
+
+def acquire_batch_lock(backend, key, wait, poll_interval=0.1):
+    """Takes the shared-cache lock for a spreadsheet batch fetch.
+
+    Returns the lock token, or None when another caller holds it and ``wait`` is
+    false. Waiting callers poll until the holder releases the lock or it expires.
+    """
+    while True:
+        token = backend.try_lock(key, BATCH_LOCK_SECONDS)
+        if token is not None or not wait:
+            return token
+        time.sleep(poll_interval)
+
+def fetch_daily_range(client, dates):
+    """Returns ``({date: ingest.Tab}, {date: issues}, throttled)`` for a list of dates.
+
+    Only dates with valid 24-hour data get a tab; ``issues`` lists the data problems
+    found in each day, including schema errors for days that were skipped.
+
+    Days already in the shared cache are reused; the rest are fetched with one
+    batch request per monthly spreadsheet and stored under the same keys
+    ``load_sheet_data`` uses, so the single-day view reuses them too. One caller
+    across replicas fetches a spreadsheet at a time; when all of its missing days
+    have stale copies, those are served instead of waiting on it. ``throttled``
+    is True when Sheets quota kept some days from loading; if no day could be
+    served at all, ``sheets_access.SheetsThrottled`` is raised instead.
+    """
+    import gspread
+    backend = shared_cache.get_backend()
+    frames, stale, missing, issues = {}, {}, {}, {}
+    throttled = False
+    for date in dates:
+        sheet_name, tab_name = daily_sheet_and_tab(date)
+        entry = backend.get(shared_cache.make_key("sheet", sheet_name, tab_name))
+        if shared_cache.is_fresh(entry):
+            frames[date] = entry.value
+            continue
+        if entry is not None:
+            stale[date] = entry.value
+        missing.setdefault(sheet_name, []).append((date, tab_name))
+
+    for sheet_name, wanted in missing.items():
+        # When every day has a stale copy the user is never kept waiting: a replica
+        # already fetching this spreadsheet, or a throttled attempt, means stale is served.
+        has_stale = all(date in stale for date, _ in wanted)
+        lock_key = shared_cache.make_key("sheet_batch", sheet_name)
+        if has_stale and sheets_access.limiter.available() < sheets_access.REQUESTS_PER_FETCH:
+            token = None
+        else:
+            token = acquire_batch_lock(backend, lock_key, wait=not has_stale)
+        if token is None:
+            perf_metrics.count("sheets_served_stale")
+            frames.update({date: stale[date] for date, _ in wanted})
+            continue
+        try:
+            # Another replica may have stored some of these days while we waited.
+            pending = []
+            for date, tab_name in wanted:
+                entry = backend.get(shared_cache.make_key("sheet", sheet_name, tab_name))
+                if shared_cache.is_fresh(entry):
+                    frames[date] = entry.value
+                else:
+                    pending.append((date, tab_name))
+            if not pending:
+                continue
+            options = {"max_attempts": 1, "token_timeout": 0} if has_stale else {}
+            try:
+                records_by_tab = sheets_access.fetch_tabs(
+                    client, sheet_name, [tab_name for _, tab_name in pending], **options
+                )
+            except gspread.exceptions.SpreadsheetNotFound:
+                continue
+            except Exception as e:
+                if not sheets_access.is_throttled(e):
+                    raise
+                # Quota exhausted: stand in with whatever stale days we have.
+                throttled = True
+                frames.update({date: stale[date] for date, _ in pending if date in stale})
+                continue
+            for date, tab_name in pending:
+                try:
+                    tab = ingest.ingest(records_by_tab.get(tab_name, []), ingest.DAILY)
+                except ingest.SchemaError as e:
+                    issues[date] = [str(e)]
+                    continue
+                if not tab.df.empty:
+                    backend.set(shared_cache.make_key("sheet", sheet_name, tab_name), tab, sheet_ttl(date))
+                    frames[date] = tab
+        finally:
+            backend.release(lock_key, token)
+    if throttled and not frames:
+        raise sheets_access.SheetsThrottled("Google Sheets request quota exhausted; try again shortly.")
+    issues.update({date: tab.issues for date, tab in frames.items() if tab.issues})
+    return frames, issues, throttled
+
+@perf_metrics.instrumented_cache("sheet", st.cache_data(ttl=SHEET_LOCAL_TTL_SECONDS))
+def load_sheet_data(sheet_name, tab_name, kind, ttl=SHEET_TTL_SECONDS):
+    """Loads and validates a Google Sheet tab, shared across replicas for ``ttl`` seconds.
+
+    Returns an ``ingest.Tab``, or None when the tab is missing, empty or invalid.
+    """
+    import gspread
     try:
         client = get_gsheet_client()
-        if client:
-            sheet = client.open(sheet_name).worksheet(tab_name)
-            df = pd.DataFrame(sheet.get_all_records())
-            df.columns = df.columns.str.strip()
-            if 'TOTAL' in df.columns:
-                df.rename(columns={"DISTRICT": "District", "TALUKA": "Taluka", "TOTAL": "Total_mm"}, inplace=True)
-            else:
-                df.rename(columns={"DISTRICT": "District", "TALUKA": "Taluka"}, inplace=True)
-            return df
-        return pd.DataFrame()
+        if not client:
+            return None
+        result = sheets_access.load(
+            shared_cache.make_key("sheet", sheet_name, tab_name),
+            lambda **options: fetch_sheet_tab(client, sheet_name, tab_name, kind, **options),
+            ttl=ttl,
+            should_cache=lambda tab: not tab.df.empty
+        )
+        if result.stale:
+            fetched_at = datetime.fromtimestamp(result.stored_at).strftime("%H:%M")
+            st.info(f"Google Sheets is busy; showing data fetched at {fetched_at}. It will refresh shortly.")
+        tab = result.value
+        if tab.issues:
+            st.warning(f"⚠️ Data issues in '{tab_name}': " + "; ".join(tab.issues) + ".")
+        return tab if not tab.df.empty else None
+    except ingest.SchemaError as e:
+        st.error(f"Invalid data in sheet '{sheet_name}' tab '{tab_name}': {e}")
+        return None
     except gspread.exceptions.WorksheetNotFound:
         st.warning(f"⚠️ Data sheet for '{tab_name}' not found. Please check your sheet and tab names.")
-        return pd.DataFrame()
+        return None
     except gspread.exceptions.SpreadsheetNotFound:
         st.error(f"Spreadsheet '{sheet_name}' not found. Please ensure the spreadsheet name is correct and it is shared with the service account.")
-        return pd.DataFrame()
+        return None
     except Exception as e:
         st.error(f"Error loading data from sheet '{sheet_name}' tab '{tab_name}': {e}")
-        return pd.DataFrame()
+        return None
 
 def correct_taluka_names(df):
     """Corrects known inconsistencies in taluka names."""
@@ -220,8 +385,19 @@ def correct_taluka_names(df):
     df['Taluka'] = df['Taluka'].replace(taluka_name_mapping)
     return df
 
+@perf_metrics.instrumented_cache("figure", st.cache_resource(max_entries=64))
+def cached_figure(content_hash, name, _build):
+    """Returns figure ``name`` for the data with ``content_hash``, calling ``_build()`` on a miss.
+
+    Figures are shared read-only across sessions of this process.
+    """
+    return _build()
+
+@perf_metrics.timed("plot_choropleth")
 def plot_choropleth(df, geojson_path, title, geo_feature_id_key, geo_location_col):
     """Generates a choropleth map with data categories."""
+    import plotly.express as px
+    import plotly.graph_objects as go
     geojson_data = load_geojson(geojson_path)
     if not geojson_data:
         return go.Figure()
@@ -252,12 +428,6 @@ def plot_choropleth(df, geojson_path, title, geo_feature_id_key, geo_location_co
             ordered=True
         )
 
-    for feature in geojson_data["features"]:
-        if geo_feature_id_key == "properties.SUB_DISTRICT" and "SUB_DISTRICT" in feature["properties"]:
-            feature["properties"]["SUB_DISTRICT"] = feature["properties"]["SUB_DISTRICT"].strip().lower()
-        elif geo_feature_id_key == "properties.district" and "district" in feature["properties"]:
-            feature["properties"]["district"] = feature["properties"]["district"].strip().lower()
-
     fig = px.choropleth_mapbox(
         df_plot,
         geojson=geojson_data,
@@ -295,49 +465,275 @@ def plot_choropleth(df, geojson_path, title, geo_feature_id_key, geo_location_co
     )
     return fig
 
+@perf_metrics.timed("plot_choropleth_frames")
+def plot_choropleth_frames(series, frame_labels, geojson_path, geo_feature_id_key, frame_prefix):
+    """Generates an animated category map that sends the geometry only once.
 
-def show_24_hourly_dashboard(df, selected_date):
-    """Generates and displays the daily summary dashboard elements."""
-    df = correct_taluka_names(df)
-    if "Rain_Last_24_Hrs" in df.columns:
-        df.rename(columns={"Rain_Last_24_Hrs": "Total_mm"}, inplace=True)
+    ``series`` holds ``locations`` plus per-frame ``codes`` and ``values`` arrays (see
+    ``build_frame_series``). The base trace carries the GeoJSON; every frame only
+    replaces its category codes and hover values.
+    """
+    import plotly.graph_objects as go
+    geojson_data = load_geojson(geojson_path)
+    if not geojson_data or not frame_labels:
+        return go.Figure()
 
-    required_cols = ["Total_mm", "Taluka", "District"]
-    for col in required_cols:
-        if col not in df.columns:
-            st.error(f"Required column '{col}' not found in the loaded data.")
-            return
+    num_categories = len(ordered_categories)
+    colorscale = []
+    for i, category in enumerate(ordered_categories):
+        colorscale += [[i / num_categories, color_map[category]], [(i + 1) / num_categories, color_map[category]]]
+
+    fig = go.Figure(
+        data=[go.Choroplethmapbox(
+            geojson=geojson_data,
+            featureidkey=geo_feature_id_key,
+            locations=series["locations"],
+            z=series["codes"][0],
+            customdata=series["values"][0],
+            zmin=-0.5,
+            zmax=num_categories - 0.5,
+            colorscale=colorscale,
+            marker_opacity=0.75,
+            marker_line_width=0.5,
+            hovertemplate="<b>%{location}</b><br>Rainfall: %{customdata:.1f} mm<extra></extra>",
+            colorbar=dict(
+                title="Rainfall Categories (mm)",
+                tickvals=list(range(num_categories)),
+                ticktext=ordered_categories,
+                orientation="h",
+                y=-0.02,
+                yanchor="top",
+                thickness=12,
+            ),
+        )],
+        frames=[
+            go.Frame(
+                name=label,
+                data=[go.Choroplethmapbox(z=series["codes"][i], customdata=series["values"][i])],
+                traces=[0],
+            )
+            for i, label in enumerate(frame_labels)
+        ],
+    )
 
+    frame_args = lambda duration: dict(
+        frame=dict(duration=duration, redraw=True), mode="immediate", transition=dict(duration=0)
+    )
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        mapbox_zoom=6,
+        mapbox_center={"lat": 22.5, "lon": 71.5},
+        height=700,
+        margin={"r":0,"t":0,"l":0,"b":0},
+        uirevision='true',
+        updatemenus=[dict(
+            type="buttons",
+            direction="left",
+            x=0.01, y=0.99, xanchor="left", yanchor="top",
+            buttons=[
+                dict(label="▶ Play", method="animate", args=[None, {**frame_args(800), "fromcurrent": True}]),
+                dict(label="⏸ Pause", method="animate", args=[[None], frame_args(0)]),
+            ],
+        )],
+        sliders=[dict(
+            active=0,
+            x=0.01, len=0.98, y=0.01, yanchor="bottom",
+            currentvalue=dict(prefix=frame_prefix),
+            steps=[
+                dict(label=label, method="animate", args=[[label], frame_args(0)])
+                for label in frame_labels
+            ],
+        )],
+    )
+    return fig
+
+
+def build_frame_series(wide):
+    """Turns a frames x locations table of rainfall (mm) into per-frame map arrays."""
+    values = wide.to_numpy(dtype=float).round(1)
+    codes = classify_rainfall_codes(values)
+    return {
+        "locations": [str(location) for location in wide.columns],
+        "values": values,
+        "codes": codes,
+        "category_counts": np.stack([np.bincount(row, minlength=len(ordered_categories)) for row in codes]),
+    }
+
+
+def normalize_daily_frame(df):
+    """Applies taluka name corrections to an ingested 24-hour frame."""
+    return correct_taluka_names(df)
+
+def build_category_counts(category_series):
+    """Counts rows per rainfall category in display order."""
+    category_counts = category_series.value_counts().reset_index()
+    category_counts.columns = ['Category', 'Count']
+    category_counts['Category'] = pd.Categorical(
+        category_counts['Category'],
+        categories=ordered_categories,
+        ordered=True
+    )
+    category_counts = category_counts.sort_values('Category')
+    category_counts['Rainfall_Range'] = category_counts['Category'].map(category_ranges)
+    return category_counts
+
+@perf_metrics.timed("build_daily_model")
+def build_daily_model(df):
+    """Computes the metrics and frames shown on the daily summary dashboard."""
     if 'Total_Rainfall' not in df.columns:
         df['Total_Rainfall'] = df['Total_mm'] * 1.5
     if 'Percent_Against_Avg' not in df.columns:
         df['Percent_Against_Avg'] = (df['Total_Rainfall'] / 700) * 100
 
-    df["Total_mm"] = pd.to_numeric(df["Total_mm"], errors='coerce')
-    df["Total_Rainfall"] = pd.to_numeric(df["Total_Rainfall"], errors='coerce')
-    df["Percent_Against_Avg"] = pd.to_numeric(df["Percent_Against_Avg"], errors='coerce')
-    
-    district_name_mapping = {
-        "Chhota Udepur": "Chhota Udaipur", "Dangs": "Dang",
-        "Kachchh": "Kutch", "Mahesana": "Mehsana",
-    }
+
     df['District'] = df['District'].replace(district_name_mapping)
     df['District'] = df['District'].astype(str).str.strip()
 
-    title = generate_title_from_date(selected_date)
-    st.markdown(f'<h2 class="no-link-h2">{title}</h2>', unsafe_allow_html=True)
-    st.markdown("<hr>", unsafe_allow_html=True)
-
     state_total_seasonal_avg = df["Total_Rainfall"].mean() if not df["Total_Rainfall"].isnull().all() else 0.0
     state_avg_24hr = df["Total_mm"].mean() if not df["Total_mm"].isnull().all() else 0.0
     highest_taluka = df.loc[df["Total_mm"].idxmax()] if not df["Total_mm"].isnull().all() else pd.Series({'Taluka': 'N/A', 'Total_mm': 0, 'District': 'N/A'})
     state_rainfall_progress_percentage = df['Percent_Against_Avg'].mean() if not df["Percent_Against_Avg"].isnull().all() else 0.0
     highest_district_row = df.groupby('District')['Total_mm'].mean().reset_index().sort_values(by='Total_mm', ascending=False).iloc[0] if not df["Total_mm"].isnull().all() else pd.Series({'District': 'N/A', 'Total_mm': 0})
-    highest_district = highest_district_row['District']
-    highest_district_avg = highest_district_row['Total_mm']
+
+    district_rainfall_avg_df = df.groupby('District')['Total_mm'].mean().reset_index()
+    district_rainfall_avg_df = district_rainfall_avg_df.rename(
+        columns={'Total_mm': 'District_Avg_Rain_Last_24_Hrs'}
+    )
+    district_rainfall_avg_df["Rainfall_Category"] = district_rainfall_avg_df["District_Avg_Rain_Last_24_Hrs"].apply(classify_rainfall)
+    district_rainfall_avg_df["Rainfall_Category"] = pd.Categorical(
+        district_rainfall_avg_df["Rainfall_Category"],
+        categories=ordered_categories,
+        ordered=True
+    )
+    district_rainfall_avg_df['Rainfall_Range'] = district_rainfall_avg_df['Rainfall_Category'].map(category_ranges)
+
+    df_map_talukas = df.copy()
+    df_map_talukas["Taluka"] = df_map_talukas["Taluka"].str.strip().str.lower()
+    df_map_talukas["Rainfall_Category"] = df_map_talukas["Total_mm"].apply(classify_rainfall)
+    df_map_talukas["Rainfall_Category"] = pd.Categorical(
+        df_map_talukas["Rainfall_Category"],
+        categories=ordered_categories,
+        ordered=True
+    )
+    df_map_talukas["Rainfall_Range"] = df_map_talukas["Rainfall_Category"].map(category_ranges)
+
+    return {
+        "df": df,
+        "state_total_seasonal_avg": state_total_seasonal_avg,
+        "state_avg_24hr": state_avg_24hr,
+        "highest_taluka": highest_taluka,
+        "state_rainfall_progress_percentage": state_rainfall_progress_percentage,
+        "highest_district": highest_district_row['District'],
+        "highest_district_avg": highest_district_row['Total_mm'],
+        "num_talukas_with_rain_today": df[df['Total_mm'] > 0].shape[0],
+        "district_rainfall_avg_df": district_rainfall_avg_df,
+        "df_map_talukas": df_map_talukas,
+        "category_counts_dist": build_category_counts(district_rainfall_avg_df['Rainfall_Category']),
+        "category_counts_tal": build_category_counts(df_map_talukas['Rainfall_Category']),
+        "df_top_10": df.dropna(subset=['Total_mm']).sort_values(by='Total_mm', ascending=False).head(10),
+        "table": data_table.ArrowTable.from_frame(df, default_sort="Total_mm", default_ascending=False),
+    }
+
+
+@perf_metrics.instrumented_cache("daily_model", st.cache_data(max_entries=64))
+def load_daily_model(content_hash, _tab):
+    """Returns the daily summary model for an ingested tab, shared across replicas.
+
+    The model is keyed on the tab's content hash; ``_tab`` is only read on a miss.
+    """
+    model = shared_cache.get_or_compute(
+        shared_cache.make_key("daily_model", MODEL_VERSION, content_hash),
+        lambda: build_daily_model(normalize_daily_frame(_tab.df.copy())),
+        ttl=DERIVED_TTL_SECONDS
+    )
+    return {**model, "content_hash": content_hash}
+
+
+@perf_metrics.timed("build_range_model")
+def build_range_model(frames):
+    """Precomputes per-day district and taluka values and categories for the multi-day maps."""
+    daily_frames = []
+    for date in sorted(frames):
+        df = normalize_daily_frame(frames[date].df.copy())
+        daily_frames.append(pd.DataFrame({
+            "Date": date,
+            "District": df["District"].replace(district_name_mapping).astype(str).str.strip().str.lower(),
+            "Taluka": df["Taluka"].astype(str).str.strip().str.lower(),
+            "Total_mm": df["Total_mm"],
+        }))
+    if not daily_frames:
+        return None
+
+    df_range = pd.concat(daily_frames, ignore_index=True)
+    dates = [frame["Date"].iloc[0] for frame in daily_frames]
+    return {
+        "dates": dates,
+        "District": build_frame_series(df_range.groupby(["Date", "District"])["Total_mm"].mean().unstack().reindex(dates)),
+        "Taluka": build_frame_series(df_range.groupby(["Date", "Taluka"])["Total_mm"].mean().unstack().reindex(dates)),
+    }
+
+def show_range_issues(issues):
+    """Reports the data problems found in a date range, one line per day."""
+    if issues:
+        st.warning("⚠️ Data issues in the selected range:\n" + "\n".join(
+            f"- {date.strftime('%d-%m-%Y')}: " + "; ".join(issues[date]) for date in sorted(issues)
+        ))
+
+@perf_metrics.instrumented_cache("range_model", st.cache_data(ttl=SHEET_LOCAL_TTL_SECONDS))
+def load_range_model(start_date, end_date):
+    """Returns the multi-day map model for a date range, shared across replicas.
+
+    The model is keyed on the content hashes of the days found, so it is rebuilt
+    only when a day's data changes or a missing day arrives. Returns None, after
+    showing why, when no day could be loaded.
+    """
+    client = get_gsheet_client()
+    if not client:
+        return None
+    dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    try:
+        tabs, issues, throttled = fetch_daily_range(client, dates)
+        if not tabs:
+            show_range_issues(issues)
+            st.warning(f"⚠️ Daily data is not available between {start_date} and {end_date}.")
+            return None
+        content_hash = ingest.combine_hashes((date, tabs[date].content_hash) for date in sorted(tabs))
+        model = shared_cache.get_or_compute(
+            shared_cache.make_key("range_model", MODEL_VERSION, content_hash),
+            lambda: build_range_model(tabs),
+            ttl=DERIVED_TTL_SECONDS
+        )
+        show_range_issues(issues)
+        return {**model, "content_hash": content_hash, "throttled": throttled}
+    except sheets_access.SheetsThrottled:
+        st.warning("⚠️ Google Sheets is busy right now, so the daily data could not be loaded. Please try again in a minute.")
+        return None
+    except Exception as e:
+        st.error(f"Error loading daily data from {start_date} to {end_date}: {e}")
+        return None
+
+
+def show_24_hourly_dashboard(model, selected_date):
+    """Generates and displays the daily summary dashboard elements."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    df = model["df"]
+    state_total_seasonal_avg = model["state_total_seasonal_avg"]
+    state_avg_24hr = model["state_avg_24hr"]
+    highest_taluka = model["highest_taluka"]
+    state_rainfall_progress_percentage = model["state_rainfall_progress_percentage"]
+    highest_district = model["highest_district"]
+    highest_district_avg = model["highest_district_avg"]
+    num_talukas_with_rain_today = model["num_talukas_with_rain_today"]
+    district_rainfall_avg_df = model["district_rainfall_avg_df"]
+    df_map_talukas = model["df_map_talukas"]
+
+    title = generate_title_from_date(selected_date)
+    st.markdown(f'<h2 class="no-link-h2">{title}</h2>', unsafe_allow_html=True)
+    st.markdown("<hr>", unsafe_allow_html=True)
     
     TOTAL_TALUKAS_GUJARAT = 251
-    num_talukas_with_rain_today = df[df['Total_mm'] > 0].shape[0]
 
     col_donut, col_metrics = st.columns([0.3, 0.7])
 
@@ -373,7 +769,7 @@ def show_24_hourly_dashboard(df, selected_date):
                 font_color='#01579b'
             )]
         )
-        st.plotly_chart(fig_donut, use_container_width=True)
+        perf_metrics.plotly_chart(fig_donut, "state_progress_donut", use_container_width=True)
 
     with col_metrics:
         col_top1, col_top2 = st.columns(2)
@@ -402,29 +798,6 @@ def show_24_hourly_dashboard(df, selected_date):
     
     st.markdown("### 🗺️ Rainfall Distribution Overview", unsafe_allow_html=True)
 
-    district_rainfall_avg_df = df.groupby('District')['Total_mm'].mean().reset_index()
-    district_rainfall_avg_df = district_rainfall_avg_df.rename(
-        columns={'Total_mm': 'District_Avg_Rain_Last_24_Hrs'}
-    )
-    district_rainfall_avg_df["Rainfall_Category"] = district_rainfall_avg_df["District_Avg_Rain_Last_24_Hrs"].apply(classify_rainfall)
-    district_rainfall_avg_df["Rainfall_Category"] = pd.Categorical(
-        district_rainfall_avg_df["Rainfall_Category"],
-        categories=ordered_categories,
-        ordered=True
-    )
-    district_rainfall_avg_df['Rainfall_Range'] = district_rainfall_avg_df['Rainfall_Category'].map(category_ranges)
-
-
-    df_map_talukas = df.copy()
-    df_map_talukas["Taluka"] = df_map_talukas["Taluka"].str.strip().str.lower()
-    df_map_talukas["Rainfall_Category"] = df_map_talukas["Total_mm"].apply(classify_rainfall)
-    df_map_talukas["Rainfall_Category"] = pd.Categorical(
-        df_map_talukas["Rainfall_Category"],
-        categories=ordered_categories,
-        ordered=True
-    )
-    df_map_talukas["Rainfall_Range"] = df_map_talukas["Rainfall_Category"].map(category_ranges)
-
     taluka_geojson = load_geojson("gujarat_taluka_clean.geojson")
     district_geojson = load_geojson("gujarat_district_clean.geojson")
 
@@ -439,26 +812,18 @@ def show_24_hourly_dashboard(df, selected_date):
         with map_col_dist:
             st.markdown("#### Gujarat Rainfall Map (by District)")
             with st.spinner("Loading district map..."):
-                fig_map_districts = plot_choropleth(
+                fig_map_districts = cached_figure(model["content_hash"], "district_map", lambda: plot_choropleth(
                     district_rainfall_avg_df,
                     "gujarat_district_clean.geojson",
                     title="Gujarat Daily Rainfall Distribution by District",
                     geo_feature_id_key="properties.district",
                     geo_location_col="District"
-                )
-                st.plotly_chart(fig_map_districts, use_container_width=True)
+                ))
+                perf_metrics.plotly_chart(fig_map_districts, "district_map", use_container_width=True)
 
         with insights_col_dist:
             st.markdown("#### Key Insights & Distributions (Districts)")
-            category_counts_dist = district_rainfall_avg_df['Rainfall_Category'].value_counts().reset_index()
-            category_counts_dist.columns = ['Category', 'Count']
-            category_counts_dist['Category'] = pd.Categorical(
-                category_counts_dist['Category'],
-                categories=ordered_categories,
-                ordered=True
-            )
-            category_counts_dist = category_counts_dist.sort_values('Category')
-            category_counts_dist['Rainfall_Range'] = category_counts_dist['Category'].map(category_ranges)
+            category_counts_dist = model["category_counts_dist"]
             fig_category_dist_dist = px.bar(
                 category_counts_dist,
                 x='Category',
@@ -480,21 +845,21 @@ def show_24_hourly_dashboard(df, selected_date):
                 height=350,
                 margin=dict(l=0, r=0, t=50, b=0)
             )
-            st.plotly_chart(fig_category_dist_dist, use_container_width=True, key="district_insights_bar_chart")
+            perf_metrics.plotly_chart(fig_category_dist_dist, "district_category_bar", use_container_width=True, key="district_insights_bar_chart")
 
     with tab_talukas:
         map_col_tal, insights_col_tal = st.columns([0.5, 0.5])
         with map_col_tal:
             st.markdown("#### Gujarat Rainfall Map (by Taluka)")
             with st.spinner("Loading taluka map..."):
-                fig_map_talukas = plot_choropleth(
+                fig_map_talukas = cached_figure(model["content_hash"], "taluka_map", lambda: plot_choropleth(
                     df_map_talukas,
                     "gujarat_taluka_clean.geojson",
                     title="Gujarat Rainfall Distribution by Taluka",
                     geo_feature_id_key="properties.SUB_DISTRICT",
                     geo_location_col="Taluka"
-                )
-                st.plotly_chart(fig_map_talukas, use_container_width=True, key="taluka_map_chart")
+                ))
+                perf_metrics.plotly_chart(fig_map_talukas, "taluka_map", use_container_width=True, key="taluka_map_chart")
 
         with insights_col_tal:
             st.markdown("#### Key Insights & Distributions (Talukas)")
@@ -518,17 +883,9 @@ def show_24_hourly_dashboard(df, selected_date):
             )
             fig_pie.update_traces(textinfo='percent+label', pull=[0.05 if cat == 'Talukas with Rainfall' else 0 for cat in pie_data['Category']])
             fig_pie.update_layout(showlegend=False, height=250, margin=dict(l=0, r=0, t=40, b=0))
-            st.plotly_chart(fig_pie, use_container_width=True)
-
-            category_counts_tal = df_map_talukas['Rainfall_Category'].value_counts().reset_index()
-            category_counts_tal.columns = ['Category', 'Count']
-            category_counts_tal['Category'] = pd.Categorical(
-                category_counts_tal['Category'],
-                categories=ordered_categories,
-                ordered=True
-            )
-            category_counts_tal = category_counts_tal.sort_values('Category')
-            category_counts_tal['Rainfall_Range'] = category_counts_tal['Category'].map(category_ranges)
+            perf_metrics.plotly_chart(fig_pie, "taluka_rain_pie", use_container_width=True)
+
+            category_counts_tal = model["category_counts_tal"]
             fig_category_dist_tal = px.bar(
                 category_counts_tal,
                 x='Category',
@@ -550,10 +907,10 @@ def show_24_hourly_dashboard(df, selected_date):
                 height=350,
                 margin=dict(l=0, r=0, t=50, b=0)
             )
-            st.plotly_chart(fig_category_dist_tal, use_container_width=True, key="taluka_insights_category_chart")
+            perf_metrics.plotly_chart(fig_category_dist_tal, "taluka_category_bar", use_container_width=True, key="taluka_insights_category_chart")
 
     st.markdown("### 🏆 Top 10 Talukas by Total Rainfall", unsafe_allow_html=True)
-    df_top_10 = df.dropna(subset=['Total_mm']).sort_values(by='Total_mm', ascending=False).head(10)
+    df_top_10 = model["df_top_10"]
 
     if not df_top_10.empty:
         fig_top_10 = px.bar(
@@ -574,263 +931,397 @@ def show_24_hourly_dashboard(df, selected_date):
             margin=dict(t=50),
             coloraxis_showscale=False
         )
-        st.plotly_chart(fig_top_10, use_container_width=True)
+        perf_metrics.plotly_chart(fig_top_10, "top_10_talukas", use_container_width=True)
     else:
         st.info("No rainfall data available to determine top 10 talukas.")
 
     st.markdown("### 📋 Daily Rainfall Data Table", unsafe_allow_html=True)
-    df_display = df.sort_values(by="Total_mm", ascending=False).reset_index(drop=True)
-    df_display.index += 1
-    st.dataframe(df_display, use_container_width=True, height=400)
+    data_table.show_data_table(model["table"], key="daily_table", height=400)
 
 
-# ---------------------------- UI ----------------------------
-st.set_page_config(layout="wide")
-
-col1, col2 = st.columns([0.7, 0.3])
-with col1:
-    st.markdown("<div class='title-text'>🌧️ Gujarat Rainfall Dashboard</div>", unsafe_allow_html=True)
-with col2:
-    st.markdown("<div style='text-align: right; padding-top: 1rem; font-size: 0.95rem;'>Developed By Ankit Patel (Gujarat Weatheman)</div>", unsafe_allow_html=True)
-
-st.markdown('<h2 class="no-link-h2">🗓️ Select Date for Rainfall Data</h2>', unsafe_allow_html=True)
-
-if 'selected_date' not in st.session_state:
-    st.session_state.selected_date = datetime.today().date()
-if 'daily_data' not in st.session_state:
-    st.session_state.daily_data = pd.DataFrame()
-if 'hourly_data' not in st.session_state:
-    st.session_state.hourly_data = pd.DataFrame()
-
-# This block is now outside the data-loading buttons to be visible on every rerun
-selected_year = st.session_state.selected_date.strftime("%Y")
-selected_month = st.session_state.selected_date.strftime("%B")
-selected_date_str = st.session_state.selected_date.strftime("%Y-%m-%d")
-
-# A key is added to st.date_input to prevent an error when the date changes programmatically
-col_date_picker, col_prev_btn, col_today_btn, col_next_btn = st.columns([0.2, 0.1, 0.1, 0.1])
-with col_date_picker:
-    selected_date_from_picker = st.date_input(
-        "Choose Date",
-        value=st.session_state.selected_date,
-        help="Select a specific date to view its rainfall summary.",
-        key="date_picker"
+map_levels = {
+    "District": ("gujarat_district_clean.geojson", "properties.district"),
+    "Taluka": ("gujarat_taluka_clean.geojson", "properties.SUB_DISTRICT"),
+}
+
+def show_multi_day_maps(selected_date):
+    """Generates and displays the animated maps and category comparison for a date range."""
+    import plotly.express as px
+
+    col_start, col_end, col_level = st.columns([0.2, 0.2, 0.6])
+    with col_start:
+        start_date = st.date_input("From", value=selected_date - timedelta(days=6), key="range_start")
+    with col_end:
+        end_date = st.date_input("To", value=selected_date, key="range_end")
+    with col_level:
+        level = st.radio("Map by", list(map_levels), horizontal=True, key="range_level")
+
+    num_days = (end_date - start_date).days + 1
+    if num_days < 1:
+        st.warning("⚠️ The start date must be on or before the end date.")
+        return
+    if num_days > MAX_ANIMATION_DAYS:
+        st.warning(f"⚠️ Please choose a range of at most {MAX_ANIMATION_DAYS} days.")
+        return
+    # All tabs render on every run, so the range is only fetched once asked for.
+    if not st.toggle(f"Load maps for {num_days} days", key="range_enabled"):
+        st.info("💡 Turn on the toggle above to animate daily rainfall categories across the selected dates.")
+        return
+
+    with st.spinner(f"Fetching daily data for {num_days} days..."):
+        model = load_range_model(start_date, end_date)
+    if model is None:
+        return
+    if len(model["dates"]) < num_days:
+        reason = " Google Sheets is busy; the rest will load on a later try." if model["throttled"] else ""
+        st.caption(f"Daily data found for {len(model['dates'])} of {num_days} days.{reason}")
+
+    series = model[level]
+    frame_labels = [date.strftime("%d-%m-%Y") for date in model["dates"]]
+    geojson_path, geo_feature_id_key = map_levels[level]
+
+    map_col, insights_col = st.columns([0.5, 0.5])
+    with map_col:
+        st.markdown(f"#### Daily Rainfall Categories (by {level})")
+        with st.spinner("Loading map..."):
+            fig_map = cached_figure(
+                model["content_hash"], f"range_{level}_map",
+                lambda: plot_choropleth_frames(series, frame_labels, geojson_path, geo_feature_id_key, "Date: ")
+            )
+            perf_metrics.plotly_chart(fig_map, f"range_{level.lower()}_map", use_container_width=True, key="range_map_chart")
+
+    with insights_col:
+        st.markdown(f"#### {level}s by Rainfall Category per Day")
+        counts = pd.DataFrame(series["category_counts"], index=frame_labels, columns=ordered_categories)
+        counts = counts.rename_axis("Date").reset_index().melt(id_vars="Date", var_name="Category", value_name="Count")
+        fig_counts = px.bar(
+            counts,
+            x='Date',
+            y='Count',
+            color='Category',
+            color_discrete_map=color_map,
+            category_orders={'Category': ordered_categories},
+            labels={'Count': f'Number of {level}s'},
+        )
+        fig_counts.update_layout(
+            xaxis_title=None,
+            height=650,
+            margin=dict(l=0, r=0, t=30, b=0),
+            legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5, title_text=None)
+        )
+        perf_metrics.plotly_chart(fig_counts, "range_category_bar", use_container_width=True, key="range_category_chart")
+
+
+@perf_metrics.timed("build_hourly_model")
+def build_hourly_model(df):
+    """Reshapes an ingested 2-hourly frame into per-slot rows and computes the summary metrics."""
+    df_2hr = df.copy()
+    df_2hr = correct_taluka_names(df_2hr)
+
+    existing_order = [slot for slot in time_slot_order if slot in df_2hr.columns]
+
+    df_2hr['Total_mm'] = df_2hr[existing_order].sum(axis=1)
+
+    df_long = df_2hr.melt(
+        id_vars=["District", "Taluka", "Total_mm"],
+        value_vars=existing_order,
+        var_name="Time Slot",
+        value_name="Rainfall (mm)"
     )
+    df_long = df_long.dropna(subset=["Rainfall (mm)"])
+    df_long['Taluka'] = df_long['Taluka'].str.strip()
 
-with col_prev_btn:
-    st.markdown("<br>", unsafe_allow_html=True)
-    if st.button("⬅️ Previous Day", key="prev_day_btn"):
-        st.session_state.selected_date = st.session_state.selected_date - timedelta(days=1)
-        st.session_state.daily_data = pd.DataFrame() # Clear old data
-        st.session_state.hourly_data = pd.DataFrame() # Clear old data
-        st.cache_data.clear() # Clear cache to force reload
-        st.rerun()
+    df_long = df_long.groupby(["District", "Taluka", "Time Slot"], as_index=False).agg({
+        "Rainfall (mm)": "sum",
+        "Total_mm": "first"
+    })
 
-with col_today_btn:
-    st.markdown("<br>", unsafe_allow_html=True)
-    if st.button("🗓️ Today", key="today_btn"):
-        st.session_state.selected_date = datetime.today().date()
-        st.session_state.daily_data = pd.DataFrame() # Clear old data
-        st.session_state.hourly_data = pd.DataFrame() # Clear old data
-        st.cache_data.clear() # Clear cache to force reload
-        st.rerun()
+    df_long['Time Slot Label'] = pd.Categorical(
+        df_long['Time Slot'].map(slot_labels),
+        categories=[slot_labels[s] for s in existing_order],
+        ordered=True
+    )
 
-with col_next_btn:
-    st.markdown("<br>", unsafe_allow_html=True)
-    if st.button("Next Day ➡️", key="next_day_btn", disabled=(st.session_state.selected_date >= datetime.today().date())):
-        st.session_state.selected_date = st.session_state.selected_date + timedelta(days=1)
-        st.session_state.daily_data = pd.DataFrame() # Clear old data
-        st.session_state.hourly_data = pd.DataFrame() # Clear old data
-        st.cache_data.clear() # Clear cache to force reload
-        st.rerun()
+    df_long = df_long.sort_values(by=["Taluka", "Time Slot Label"])
 
-# Automatically update the session state if the date picker is changed
-if selected_date_from_picker != st.session_state.selected_date:
-    st.session_state.selected_date = selected_date_from_picker
-    st.session_state.daily_data = pd.DataFrame()
-    st.session_state.hourly_data = pd.DataFrame()
-    st.cache_data.clear()
-    st.rerun()
-
-
-# This is the crucial part that loads the data based on user actions
-tab_hourly, tab_daily, tab_historical = st.tabs(["Hourly Trends", "Daily Summary", "Historical Data"])
-
-with tab_hourly:
-    st.markdown('<h2 class="no-link-h2">Hourly Rainfall Trends (2-Hourly)</h2>', unsafe_allow_html=True)
-    # Load data only if it's not already in session state
-    if st.session_state.hourly_data.empty:
-        with st.spinner(f"Fetching hourly data for {selected_date_str}... This may take a moment."):
-            hourly_sheet_name = f"2HR_Rainfall_{selected_month}_{selected_year}"
-            hourly_tab_name = f"2hrs_master_{selected_date_str}"
-            st.session_state.hourly_data = load_sheet_data(hourly_sheet_name, hourly_tab_name)
-
-    if not st.session_state.hourly_data.empty:
-        df_2hr = st.session_state.hourly_data.copy()
-        df_2hr = correct_taluka_names(df_2hr)
-        df_2hr.columns = df_2hr.columns.str.strip()
-
-        time_slot_columns = [col for col in df_2hr.columns if "TO" in col and df_2hr[col].dtype in ['int64', 'float64', 'object']]
-        time_slot_order = ['06TO08', '08TO10', '10TO12', '12TO14', '14TO16', '16TO18',
-                           '18TO20', '20TO22', '22TO24', '24TO02', '02TO04', '04TO06']
-        existing_order = [slot for slot in time_slot_order if slot in time_slot_columns]
-
-        for col in existing_order:
-            df_2hr[col] = pd.to_numeric(df_2hr[col], errors="coerce")
-
-        df_2hr['Total_mm'] = df_2hr[existing_order].sum(axis=1)
-
-        df_long = df_2hr.melt(
-            id_vars=["District", "Taluka", "Total_mm"],
-            value_vars=existing_order,
-            var_name="Time Slot",
-            value_name="Rainfall (mm)"
-        )
-        df_long = df_long.dropna(subset=["Rainfall (mm)"])
-        df_long['Taluka'] = df_long['Taluka'].str.strip()
+    df_2hr['Total_mm'] = pd.to_numeric(df_2hr['Total_mm'], errors='coerce')
 
-        df_long = df_long.groupby(["District", "Taluka", "Time Slot"], as_index=False).agg({
-            "Rainfall (mm)": "sum",
-            "Total_mm": "first"
-        })
+    top_taluka_row = df_2hr.sort_values(by='Total_mm', ascending=False).iloc[0] if not df_2hr['Total_mm'].dropna().empty else pd.Series({'Taluka': 'N/A', 'Total_mm': 0})
+    df_latest_slot = df_long[df_long['Time Slot'] == existing_order[-1]]
+    top_latest = df_latest_slot.sort_values(by='Rainfall (mm)', ascending=False).iloc[0] if not df_latest_slot['Rainfall (mm)'].dropna().empty else pd.Series({'Taluka': 'N/A', 'Rainfall (mm)': 0})
+    num_talukas_with_rain_hourly = df_2hr[df_2hr['Total_mm'] > 0].shape[0]
 
-        slot_labels = {
-            "06TO08": "6–8 AM", "08TO10": "8–10 AM", "10TO12": "10–12 AM",
-            "12TO14": "12–2 PM", "14TO16": "2–4 PM", "16TO18": "4–6 PM",
-            "18TO20": "6–8 PM", "20TO22": "8–10 PM", "22TO24": "10–12 PM",
-            "24TO02": "12–2 AM", "02TO04": "2–4 AM", "04TO06": "4–6 AM",
-        }
-        df_long['Time Slot Label'] = pd.Categorical(
-            df_long['Time Slot'].map(slot_labels),
-            categories=[slot_labels[s] for s in existing_order],
-            ordered=True
+    slot_rainfall = df_long.groupby(["Time Slot", "Taluka"])["Rainfall (mm)"].sum().unstack().reindex(existing_order)
+    slot_rainfall.columns = slot_rainfall.columns.str.lower()
+
+    return {
+        "df_2hr": df_2hr,
+        "df_long": df_long,
+        "existing_order": existing_order,
+        "top_taluka_row": top_taluka_row,
+        "top_latest": top_latest,
+        "num_talukas_with_rain_hourly": num_talukas_with_rain_hourly,
+        "slot_frames": build_frame_series(slot_rainfall),
+        "table": data_table.ArrowTable.from_frame(df_2hr, default_sort="Total_mm", default_ascending=False),
+    }
+
+
+@perf_metrics.instrumented_cache("hourly_model", st.cache_data(max_entries=64))
+def load_hourly_model(content_hash, _tab):
+    """Returns the 2-hourly trends model for an ingested tab, shared across replicas.
+
+    The model is keyed on the tab's content hash; ``_tab`` is only read on a miss.
+    """
+    model = shared_cache.get_or_compute(
+        shared_cache.make_key("hourly_model", MODEL_VERSION, content_hash),
+        lambda: build_hourly_model(_tab.df),
+        ttl=DERIVED_TTL_SECONDS
+    )
+    return {**model, "content_hash": content_hash}
+
+
+def show_2_hourly_dashboard(model):
+    """Generates and displays the 2-hourly trends dashboard elements."""
+    import plotly.graph_objects as go
+
+    df_long = model["df_long"]
+    existing_order = model["existing_order"]
+    top_taluka_row = model["top_taluka_row"]
+    top_latest = model["top_latest"]
+    num_talukas_with_rain_hourly = model["num_talukas_with_rain_hourly"]
+
+    st.markdown(f"#### 📊 Latest data available for time interval: **{slot_labels[existing_order[-1]]}**")
+
+    row1 = st.columns(3)
+
+    last_slot_label = slot_labels[existing_order[-1]]
+
+    row1_titles = [
+        ("Total Talukas with Rainfall", num_talukas_with_rain_hourly),
+        ("Highest Rainfall Taluka by Total Rainfall", f"{top_taluka_row['Taluka']}<br><p>{top_taluka_row['Total_mm']:.1f} mm</p>"),
+        (f"Highest Rainfall in last 2 hours ({last_slot_label})", f"{top_latest['Taluka']}<br><p>{top_latest['Rainfall (mm)']:.1f} mm</p>")
+    ]
+
+    for col, (label, value) in zip(row1, row1_titles):
+        with col:
+            st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
+            st.markdown(f"<div class='metric-tile'><h4>{label}</h4><h2>{value}</h2></div>", unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown('<h3 class="no-link-h3">📈 Rainfall Trend by 2-hourly Time Interval</h3>', unsafe_allow_html=True)
+
+    selected_talukas = st.multiselect("Select Taluka(s)", sorted(df_long['Taluka'].unique()), default=[top_taluka_row['Taluka']] if top_taluka_row['Taluka'] != 'N/A' else [])
+
+    if selected_talukas:
+        plot_df = df_long[df_long['Taluka'].isin(selected_talukas)]
+        max_y_value = plot_df['Rainfall (mm)'].max() if not plot_df['Rainfall (mm)'].dropna().empty else 1.0
+        y_axis_range_max = max_y_value * 1.15 if max_y_value > 0 else 5.0
+
+        fig = go.Figure()
+
+        for taluka in selected_talukas:
+            taluka_df = plot_df[plot_df['Taluka'] == taluka].copy()
+
+            taluka_df['category'] = taluka_df['Rainfall (mm)'].apply(classify_rainfall)
+            taluka_df['color'] = taluka_df['category'].map(color_map)
+
+            fig.add_trace(go.Scatter(
+                x=taluka_df['Time Slot Label'],
+                y=taluka_df['Rainfall (mm)'],
+                name=taluka,
+                mode='lines',
+                line=dict(width=4, color='#1A237E'),
+                hovertemplate="""
+                    <b>%{fullData.name}</b><br>
+                    Time Slot: %{x}<br>
+                    Rainfall: %{y:.1f} mm
+                """
+            ))
+
+            fig.add_trace(go.Scatter(
+                x=taluka_df['Time Slot Label'],
+                y=taluka_df['Rainfall (mm)'],
+                name=taluka,
+                mode='markers+text',
+                text=taluka_df['Rainfall (mm)'].apply(lambda x: f'{int(x)}' if pd.notnull(x) and x == int(x) else (f'{x:.1f}' if pd.notnull(x) else '')),
+                textposition='middle center',
+                marker=dict(
+                    size=30,
+                    color=taluka_df['color'],
+                    line=dict(width=1.5, color='White')
+                ),
+                textfont=dict(
+                    color='black',
+                    size=14,
+                    family="Arial Black"
+                ),
+                hovertemplate="""
+                    <b>%{fullData.name}</b><br>
+                    Time Slot: %{x}<br>
+                    Rainfall: %{y:.1f} mm
+                """,
+                showlegend=False
+            ))
+
+        fig.update_layout(
+            title='Rainfall Trend Over Time for Selected Talukas',
+            xaxis_title='Time Slot',
+            yaxis_title='Rainfall (mm)',
+            showlegend=True,
+            modebar_remove=['toImage'],
+            yaxis_rangemode='normal',
+            yaxis_range=[0, y_axis_range_max],
+            margin=dict(t=70),
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
         )
-        
-        df_long = df_long.sort_values(by=["Taluka", "Time Slot Label"])
+        perf_metrics.plotly_chart(fig, "hourly_trend", use_container_width=True)
+    else:
+        st.info("Please select at least one Taluka to view the rainfall trend.")
 
-        df_2hr['Total_mm'] = pd.to_numeric(df_2hr['Total_mm'], errors='coerce')
+    st.markdown('<h3 class="no-link-h3">🗺️ 2-Hourly Rainfall Map (by Taluka)</h3>', unsafe_allow_html=True)
+    if st.toggle("Animate rainfall categories across time slots", key="hourly_animation"):
+        with st.spinner("Loading taluka map..."):
+            fig_slots = cached_figure(model["content_hash"], "slot_map", lambda: plot_choropleth_frames(
+                model["slot_frames"],
+                [slot_labels[slot] for slot in existing_order],
+                "gujarat_taluka_clean.geojson",
+                "properties.SUB_DISTRICT",
+                "Time Slot: "
+            ))
+            perf_metrics.plotly_chart(fig_slots, "hourly_slot_map", use_container_width=True, key="hourly_slot_map_chart")
 
-        top_taluka_row = df_2hr.sort_values(by='Total_mm', ascending=False).iloc[0] if not df_2hr['Total_mm'].dropna().empty else pd.Series({'Taluka': 'N/A', 'Total_mm': 0})
-        df_latest_slot = df_long[df_long['Time Slot'] == existing_order[-1]]
-        top_latest = df_latest_slot.sort_values(by='Rainfall (mm)', ascending=False).iloc[0] if not df_latest_slot['Rainfall (mm)'].dropna().empty else pd.Series({'Taluka': 'N/A', 'Rainfall (mm)': 0})
-        num_talukas_with_rain_hourly = df_2hr[df_2hr['Total_mm'] > 0].shape[0]
+    st.markdown('<h3 class="no-link-h3">📋 2-Hourly Rainfall Data Table</h3>', unsafe_allow_html=True)
+    data_table.show_data_table(model["table"], key="hourly_table", height=600)
 
-        st.markdown(f"#### 📊 Latest data available for time interval: **{slot_labels[existing_order[-1]]}**")
 
-        row1 = st.columns(3)
+# ---------------------------- UI ----------------------------
+def main():
+    """Renders the dashboard page and records its performance metrics."""
+    perf_metrics.start_metrics_server()
+    with perf_metrics.script_run(st.session_state):
+        render_page()
+        perf_metrics.show_admin_panel()
 
-        last_slot_label = slot_labels[existing_order[-1]]
 
-        row1_titles = [
-            ("Total Talukas with Rainfall", num_talukas_with_rain_hourly),
-            ("Highest Rainfall Taluka by Total Rainfall", f"{top_taluka_row['Taluka']}<br><p>{top_taluka_row['Total_mm']:.1f} mm</p>"),
-            (f"Highest Rainfall in last 2 hours ({last_slot_label})", f"{top_latest['Taluka']}<br><p>{top_latest['Rainfall (mm)']:.1f} mm</p>")
-        ]
+def render_page():
+    """Renders the dashboard page."""
+    st.set_page_config(layout="wide")
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
-        for col, (label, value) in zip(row1, row1_titles):
-            with col:
-                st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-                st.markdown(f"<div class='metric-tile'><h4>{label}</h4><h2>{value}</h2></div>", unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-        
-        st.markdown('<h3 class="no-link-h3">📈 Rainfall Trend by 2-hourly Time Interval</h3>', unsafe_allow_html=True)
-        
-        selected_talukas = st.multiselect("Select Taluka(s)", sorted(df_long['Taluka'].unique()), default=[top_taluka_row['Taluka']] if top_taluka_row['Taluka'] != 'N/A' else [])
-    
-        if selected_talukas:
-            plot_df = df_long[df_long['Taluka'].isin(selected_talukas)]
-            max_y_value = plot_df['Rainfall (mm)'].max() if not plot_df['Rainfall (mm)'].dropna().empty else 1.0
-            y_axis_range_max = max_y_value * 1.15 if max_y_value > 0 else 5.0
-            
-            fig = go.Figure()
-            
-            for taluka in selected_talukas:
-                taluka_df = plot_df[plot_df['Taluka'] == taluka].copy()
-                
-                taluka_df['category'] = taluka_df['Rainfall (mm)'].apply(classify_rainfall)
-                taluka_df['color'] = taluka_df['category'].map(color_map)
-
-                fig.add_trace(go.Scatter(
-                    x=taluka_df['Time Slot Label'],
-                    y=taluka_df['Rainfall (mm)'],
-                    name=taluka,
-                    mode='lines',
-                    line=dict(width=4, color='#1A237E'),
-                    hovertemplate="""
-                        <b>%{fullData.name}</b><br>
-                        Time Slot: %{x}<br>
-                        Rainfall: %{y:.1f} mm
-                    """
-                ))
+    col1, col2 = st.columns([0.7, 0.3])
+    with col1:
+        st.markdown("<div class='title-text'>🌧️ Gujarat Rainfall Dashboard</div>", unsafe_allow_html=True)
+    with col2:
+        st.markdown("<div style='text-align: right; padding-top: 1rem; font-size: 0.95rem;'>Developed By Ankit Patel (Gujarat Weatheman)</div>", unsafe_allow_html=True)
 
-                fig.add_trace(go.Scatter(
-                    x=taluka_df['Time Slot Label'],
-                    y=taluka_df['Rainfall (mm)'],
-                    name=taluka,
-                    mode='markers+text',
-                    text=taluka_df['Rainfall (mm)'].apply(lambda x: f'{int(x)}' if pd.notnull(x) and x == int(x) else (f'{x:.1f}' if pd.notnull(x) else '')),
-                    textposition='middle center',
-                    marker=dict(
-                        size=30,
-                        color=taluka_df['color'],
-                        line=dict(width=1.5, color='White')
-                    ),
-                    textfont=dict(
-                        color='black',
-                        size=14,
-                        family="Arial Black"
-                    ),
-                    hovertemplate="""
-                        <b>%{fullData.name}</b><br>
-                        Time Slot: %{x}<br>
-                        Rainfall: %{y:.1f} mm
-                    """,
-                    showlegend=False
-                ))
-            
-            fig.update_layout(
-                title='Rainfall Trend Over Time for Selected Talukas',
-                xaxis_title='Time Slot',
-                yaxis_title='Rainfall (mm)',
-                showlegend=True,
-                modebar_remove=['toImage'],
-                yaxis_rangemode='normal',
-                yaxis_range=[0, y_axis_range_max],
-                margin=dict(t=70),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
+    st.markdown('<h2 class="no-link-h2">🗓️ Select Date for Rainfall Data</h2>', unsafe_allow_html=True)
+
+    if 'selected_date' not in st.session_state:
+        st.session_state.selected_date = datetime.today().date()
+    if 'daily_data' not in st.session_state:
+        st.session_state.daily_data = None
+    if 'hourly_data' not in st.session_state:
+        st.session_state.hourly_data = None
+
+    # This block is now outside the data-loading buttons to be visible on every rerun
+    selected_date_str = st.session_state.selected_date.strftime("%Y-%m-%d")
+
+    # A key is added to st.date_input to prevent an error when the date changes programmatically
+    col_date_picker, col_prev_btn, col_today_btn, col_next_btn = st.columns([0.2, 0.1, 0.1, 0.1])
+    with col_date_picker:
+        selected_date_from_picker = st.date_input(
+            "Choose Date",
+            value=st.session_state.selected_date,
+            help="Select a specific date to view its rainfall summary.",
+            key="date_picker"
+        )
+
+    # Changing the date only drops this session's copy; the next load goes through the
+    # caches, where sheet_ttl() keeps tabs for recent dates no older than a few minutes.
+    with col_prev_btn:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("⬅️ Previous Day", key="prev_day_btn"):
+            st.session_state.selected_date = st.session_state.selected_date - timedelta(days=1)
+            st.session_state.daily_data = None # Clear old data
+            st.session_state.hourly_data = None # Clear old data
+            st.rerun()
+
+    with col_today_btn:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("🗓️ Today", key="today_btn"):
+            st.session_state.selected_date = datetime.today().date()
+            st.session_state.daily_data = None # Clear old data
+            st.session_state.hourly_data = None # Clear old data
+            st.rerun()
+
+    with col_next_btn:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("Next Day ➡️", key="next_day_btn", disabled=(st.session_state.selected_date >= datetime.today().date())):
+            st.session_state.selected_date = st.session_state.selected_date + timedelta(days=1)
+            st.session_state.daily_data = None # Clear old data
+            st.session_state.hourly_data = None # Clear old data
+            st.rerun()
+
+    # Automatically update the session state if the date picker is changed
+    if selected_date_from_picker != st.session_state.selected_date:
+        st.session_state.selected_date = selected_date_from_picker
+        st.session_state.daily_data = None
+        st.session_state.hourly_data = None
+        st.rerun()
+
+
+    # This is the crucial part that loads the data based on user actions
+    tab_hourly, tab_daily, tab_multi_day, tab_historical = st.tabs(["Hourly Trends", "Daily Summary", "Multi-Day Maps", "Historical Data"])
+
+    with tab_hourly:
+        st.markdown('<h2 class="no-link-h2">Hourly Rainfall Trends (2-Hourly)</h2>', unsafe_allow_html=True)
+        # Load data only if it's not already in session state
+        hourly_sheet_name, hourly_tab_name = hourly_sheet_and_tab(st.session_state.selected_date)
+        if st.session_state.hourly_data is None:
+            with st.spinner(f"Fetching hourly data for {selected_date_str}... This may take a moment."):
+                st.session_state.hourly_data = load_sheet_data(
+                    hourly_sheet_name, hourly_tab_name, ingest.HOURLY, sheet_ttl(st.session_state.selected_date)
+                )
+
+        if st.session_state.hourly_data is not None:
+            hourly_tab = st.session_state.hourly_data
+            show_2_hourly_dashboard(load_hourly_model(hourly_tab.content_hash, hourly_tab))
+        else:
+            st.warning(f"⚠️ 2-Hourly data is not available for {selected_date_str}.")
+
+    with tab_daily:
+        st.markdown('<h2 class="no-link-h2">Daily Rainfall Summary</h2>', unsafe_allow_html=True)
+        # Load data only if it's not already in session state
+        daily_sheet_name, daily_tab_name = daily_sheet_and_tab(st.session_state.selected_date)
+        if st.session_state.daily_data is None:
+            with st.spinner(f"Fetching daily data for {selected_date_str}... This may take a moment."):
+                st.session_state.daily_data = load_sheet_data(
+                    daily_sheet_name, daily_tab_name, ingest.DAILY, sheet_ttl(st.session_state.selected_date)
                 )
+    
+        if st.session_state.daily_data is not None:
+            daily_tab = st.session_state.daily_data
+            show_24_hourly_dashboard(
+                load_daily_model(daily_tab.content_hash, daily_tab),
+                st.session_state.selected_date
             )
-            st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info("Please select at least one Taluka to view the rainfall trend.")
+            st.warning(f"⚠️ Daily data is not available for {selected_date_str}.")
 
-        st.markdown('<h3 class="no-link-h3">📋 2-Hourly Rainfall Data Table</h3>', unsafe_allow_html=True)
-        df_display_2hr = df_2hr.sort_values(by="Total_mm", ascending=False).reset_index(drop=True)
-        df_display_2hr.index += 1
-        st.dataframe(df_display_2hr, use_container_width=True, height=600)
+    with tab_multi_day:
+        st.markdown('<h2 class="no-link-h2">Multi-Day Rainfall Maps</h2>', unsafe_allow_html=True)
+        show_multi_day_maps(st.session_state.selected_date)
+
+    with tab_historical:
+        st.markdown('<h2 class="no-link-h2">Historical Rainfall Data</h2>', unsafe_allow_html=True)
+        st.info("💡 **Coming Soon:** This section will feature monthly/seasonal data, year-on-year comparisons, and long-term trends.")
 
-    else:
-        st.warning(f"⚠️ 2-Hourly data is not available for {selected_date_str}.")
-
-with tab_daily:
-    st.markdown('<h2 class="no-link-h2">Daily Rainfall Summary</h2>', unsafe_allow_html=True)
-    # Load data only if it's not already in session state
-    if st.session_state.daily_data.empty:
-        with st.spinner(f"Fetching daily data for {selected_date_str}... This may take a moment."):
-            daily_sheet_name = f"24HR_Rainfall_{selected_month}_{selected_year}"
-            daily_tab_name = f"master24hrs_{selected_date_str}"
-            st.session_state.daily_data = load_sheet_data(daily_sheet_name, daily_tab_name)
-    
-    if not st.session_state.daily_data.empty:
-        show_24_hourly_dashboard(st.session_state.daily_data, st.session_state.selected_date)
-    else:
-        st.warning(f"⚠️ Daily data is not available for {selected_date_str}.")
 
-with tab_historical:
-    st.markdown('<h2 class="no-link-h2">Historical Rainfall Data</h2>', unsafe_allow_html=True)
-    st.info("💡 **Coming Soon:** This section will feature monthly/seasonal data, year-on-year comparisons, and long-term trends.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""In-memory stand-in for the gspread client returned by ``get_gsheet_client()``.
+
+Only the calls the dashboard makes are implemented: ``client.open(name)``,
+``spreadsheet.worksheet(tab)``, ``worksheet.get_all_records()`` and, for date-range
+loads, ``spreadsheet.worksheets()`` and ``spreadsheet.values_batch_get()``. Missing sheets
+and tabs raise the same gspread exceptions as the real client, and
+``fail_next`` injects API errors such as 429 quota responses.
+"""
+import threading
+import time
+
+import gspread
+
+
+class FakeResponse:
+    """Just enough of ``requests.Response`` for ``gspread.exceptions.APIError``."""
+
+    def __init__(self, status_code, message):
+        self.status_code = status_code
+        self.text = message
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": "FAKE"}}
+
+
+def sheet_values(records):
+    """Lays ``records`` out as the header row plus data rows a Sheets range returns."""
+    header = list(records[0]) if records else []
+    return [header] + [[row.get(name, "") for name in header] for row in records]
+
+
+class FakeWorksheet:
+    def __init__(self, client, title, records):
+        self._client = client
+        self.title = title
+        self._records = records
+
+    def get_all_records(self, value_render_option=None):
+        self._client.request("get_all_records")
+        # Numericised like gspread's get_all_records ("1,234" -> 1234).
+        values = sheet_values(self._records)
+        if len(values) < 2:
+            return []
+        rows = [gspread.utils.numericise_all(row) for row in values[1:]]
+        return gspread.utils.to_records(values[0], rows)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, title, tabs):
+        self._client = client
+        self.title = title
+        self._tabs = tabs
+
+    def worksheet(self, tab_name):
+        self._client.request("worksheet")
+        if tab_name not in self._tabs:
+            raise gspread.exceptions.WorksheetNotFound(tab_name)
+        return FakeWorksheet(self._client, tab_name, self._tabs[tab_name])
+
+    def worksheets(self, exclude_hidden=False):
+        self._client.request("worksheets")
+        return [FakeWorksheet(self._client, title, records) for title, records in self._tabs.items()]
+
+    def values_batch_get(self, ranges, params=None):
+        self._client.request("values_batch_get")
+        value_ranges = []
+        for range_name in ranges:
+            tab_name = range_name.split("!")[0].strip("'").replace("''", "'")
+            if tab_name not in self._tabs:
+                raise gspread.exceptions.APIError(FakeResponse(400, f"Unable to parse range: {range_name}"))
+            value_ranges.append({
+                "range": range_name, "majorDimension": "ROWS", "values": sheet_values(self._tabs[tab_name]),
+            })
+        return {"spreadsheetId": self.title, "valueRanges": value_ranges}
+
+
+class FakeGspreadClient:
+    """Serves ``{sheet_name: {tab_name: records}}`` workbooks like a gspread client.
+
+    ``latency`` (seconds) is added to every call to mimic the Sheets round trip.
+    ``calls`` counts upstream calls by method name.
+    """
+
+    def __init__(self, workbooks, latency=0.0):
+        self.workbooks = workbooks
+        self.latency = latency
+        self.calls = {
+            "open": 0, "worksheet": 0, "get_all_records": 0, "worksheets": 0, "values_batch_get": 0,
+        }
+        self._failures = []
+        self._lock = threading.Lock()
+
+    def fail_next(self, count, status=429, message="Quota exceeded for quota metric 'Read requests'"):
+        """Makes the next ``count`` API calls raise ``APIError`` with ``status``."""
+        with self._lock:
+            self._failures.extend([(status, message)] * count)
+
+    def request(self, method):
+        with self._lock:
+            self.calls[method] += 1
+            failure = self._failures.pop(0) if self._failures else None
+        if self.latency:
+            time.sleep(self.latency)
+        if failure:
+            raise gspread.exceptions.APIError(FakeResponse(*failure))
+
+    def open(self, sheet_name):
+        self.request("open")
+        if sheet_name not in self.workbooks:
+            raise gspread.exceptions.SpreadsheetNotFound(sheet_name)
+        return FakeSpreadsheet(self, sheet_name, self.workbooks[sheet_name])
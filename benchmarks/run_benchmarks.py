@@ -0,0 +1,240 @@
+"""Times the dashboard pipeline against synthetic data and flags regressions.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks                     # compare with stored baselines
+    python -m benchmarks.run_benchmarks --scale india       # all-India sub-district scale
+    python -m benchmarks.run_benchmarks --update-baseline   # record new baselines
+
+Timings are medians over ``--repeat`` runs after one warmup run. A case is flagged
+when its median is more than ``--tolerance`` times the baseline, or when a figure's
+serialized size grows by more than ``--size-tolerance``. Baselines are machine
+specific, so refresh them on the machine you compare against.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks import synthetic_data
+from benchmarks.fake_gspread import FakeGspreadClient
+
+REPO_ROOT = synthetic_data.REPO_ROOT
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+BENCH_DATE = date(2025, 7, 15)
+HISTORY_DAYS = 30
+
+
+def time_call(func, repeat):
+    """Returns the median wall time of ``func()`` over ``repeat`` runs, after one warmup."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def build_cases(app, scale, workdir):
+    """Returns ``{name: (callable, figure_factory_or_None)}`` for every benchmark case."""
+    workbooks = synthetic_data.make_workbooks(BENCH_DATE, days=HISTORY_DAYS, scale=scale)
+    client = FakeGspreadClient(workbooks)
+    app.get_gsheet_client = lambda: client
+    # Time parsing, not the Sheets quota.
+    app.sheets_access.limiter = app.sheets_access.TokenBucket(rate=1e9, capacity=1e9)
+
+    daily_sheet = synthetic_data.daily_sheet_name(BENCH_DATE)
+    daily_tab = synthetic_data.daily_tab_name(BENCH_DATE)
+    hourly_sheet = synthetic_data.hourly_sheet_name(BENCH_DATE)
+    hourly_tab = synthetic_data.hourly_tab_name(BENCH_DATE)
+
+    def load_uncached(sheet_name, tab_name, kind):
+        app.load_sheet_data.clear()
+        app.shared_cache.get_backend().clear()
+        return app.load_sheet_data(sheet_name, tab_name, kind)
+
+    daily_ingested = load_uncached(daily_sheet, daily_tab, app.ingest.DAILY)
+    hourly_ingested = load_uncached(hourly_sheet, hourly_tab, app.ingest.HOURLY)
+    daily_raw = daily_ingested.df
+    hourly_raw = hourly_ingested.df
+    daily_model = app.build_daily_model(app.normalize_daily_frame(daily_raw.copy()))
+
+    taluka_geojson_path = synthetic_data.write_taluka_geojson(
+        os.path.join(workdir, "taluka.geojson"), synthetic_data.make_talukas(scale)
+    )
+
+    def district_map():
+        return app.plot_choropleth(
+            daily_model["district_rainfall_avg_df"],
+            "gujarat_district_clean.geojson",
+            title="Gujarat Daily Rainfall Distribution by District",
+            geo_feature_id_key="properties.district",
+            geo_location_col="District",
+        )
+
+    def taluka_map():
+        return app.plot_choropleth(
+            daily_model["df_map_talukas"],
+            taluka_geojson_path,
+            title="Gujarat Rainfall Distribution by Taluka",
+            geo_feature_id_key="properties.SUB_DISTRICT",
+            geo_location_col="Taluka",
+        )
+
+    history_tabs = [
+        (sheet_name, tab_name)
+        for sheet_name, tabs in workbooks.items() if sheet_name.startswith("24HR_")
+        for tab_name in tabs
+    ]
+    history_raw = [load_uncached(sheet_name, tab_name, app.ingest.DAILY).df for sheet_name, tab_name in history_tabs]
+
+    def history_models():
+        for raw in history_raw:
+            app.build_daily_model(app.normalize_daily_frame(raw.copy()))
+
+    import data_table
+    import pandas as pd
+
+    history_frame = pd.concat(
+        [app.build_daily_model(app.normalize_daily_frame(raw.copy()))["df"] for raw in history_raw], ignore_index=True
+    )
+    history_table = data_table.ArrowTable.from_frame(history_frame, default_sort="Total_mm", default_ascending=False)
+
+    def history_table_pages():
+        for column in ("Total_mm", "Taluka", "District"):
+            order = history_table.row_order(column, ascending=False, filter_text="a")
+            history_table.page(order, page=3, page_size=50)
+
+    range_end = BENCH_DATE + timedelta(days=HISTORY_DAYS - 1)
+
+    def load_range_uncached():
+        app.load_range_model.clear()
+        app.shared_cache.get_backend().clear()
+        return app.load_range_model(BENCH_DATE, range_end)
+
+    range_model = load_range_uncached()
+    range_labels = [day.strftime("%d-%m-%Y") for day in range_model["dates"]]
+
+    def district_animation():
+        return app.plot_choropleth_frames(
+            range_model["District"], range_labels,
+            "gujarat_district_clean.geojson", "properties.district", "Date: "
+        )
+
+    def taluka_animation():
+        return app.plot_choropleth_frames(
+            range_model["Taluka"], range_labels, taluka_geojson_path, "properties.SUB_DISTRICT", "Date: "
+        )
+
+    def daily_model_unchanged():
+        # A refetch that returns the same content maps to the same hash, so only
+        # the per-process layer is lost and the model comes from the shared cache.
+        app.load_daily_model.clear()
+        return app.load_daily_model(daily_ingested.content_hash, daily_ingested)
+
+    return {
+        "load_sheet_data_daily": (lambda: load_uncached(daily_sheet, daily_tab, app.ingest.DAILY), None),
+        "load_sheet_data_hourly": (lambda: load_uncached(hourly_sheet, hourly_tab, app.ingest.HOURLY), None),
+        "ingest_daily": (lambda: app.ingest.ingest(workbooks[daily_sheet][daily_tab], app.ingest.DAILY), None),
+        "ingest_hourly": (lambda: app.ingest.ingest(workbooks[hourly_sheet][hourly_tab], app.ingest.HOURLY), None),
+        "daily_model_unchanged_refetch": (daily_model_unchanged, None),
+        "daily_model": (lambda: app.build_daily_model(app.normalize_daily_frame(daily_raw.copy())), None),
+        "hourly_reshape": (lambda: app.build_hourly_model(hourly_raw), None),
+        "choropleth_district": (district_map, district_map),
+        "choropleth_taluka": (taluka_map, taluka_map),
+        f"daily_model_history_{HISTORY_DAYS}d": (history_models, None),
+        f"table_build_{HISTORY_DAYS}d": (
+            lambda: data_table.ArrowTable.from_frame(history_frame, default_sort="Total_mm"), None
+        ),
+        f"table_sort_filter_page_{HISTORY_DAYS}d": (history_table_pages, None),
+        f"range_model_{HISTORY_DAYS}d": (load_range_uncached, None),
+        f"choropleth_district_animation_{HISTORY_DAYS}d": (district_animation, district_animation),
+        f"choropleth_taluka_animation_{HISTORY_DAYS}d": (taluka_animation, taluka_animation),
+    }
+
+
+def run(scale, repeat, only=None):
+    """Runs the benchmark cases and returns ``{name: {"median_s": ..., "figure_bytes": ...}}``."""
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+    import streamlit.logger
+
+    # Outside `streamlit run` every st.* call warns about a missing ScriptRunContext.
+    streamlit.logger.set_log_level("error")
+    import app
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (func, figure_factory) in build_cases(app, scale, workdir).items():
+            if only and name not in only:
+                continue
+            result = {"median_s": time_call(func, repeat)}
+            if figure_factory is not None:
+                fig = figure_factory()
+                result["serialize_s"] = time_call(fig.to_json, repeat)
+                result["figure_bytes"] = len(fig.to_json().encode("utf-8"))
+            results[name] = result
+    return results
+
+
+def compare(results, baseline, tolerance, size_tolerance):
+    """Returns a list of human-readable regression messages."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ("median_s", "serialize_s"):
+            if key in result and key in base and result[key] > base[key] * tolerance:
+                regressions.append(f"{name}.{key}: {result[key]:.4f}s vs baseline {base[key]:.4f}s")
+        if "figure_bytes" in result and "figure_bytes" in base and result["figure_bytes"] > base["figure_bytes"] * size_tolerance:
+            regressions.append(f"{name}.figure_bytes: {result['figure_bytes']} vs baseline {base['figure_bytes']}")
+    return regressions
+
+
+def load_baselines():
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(synthetic_data.SCALES), default="gujarat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="Run only the named cases.")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--size-tolerance", type=float, default=1.1)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.only)
+    for name, result in results.items():
+        line = f"{name:<32} {result['median_s'] * 1000:9.2f} ms"
+        if "figure_bytes" in result:
+            line += f"   serialize {result['serialize_s'] * 1000:8.2f} ms   {result['figure_bytes'] / 1024:9.1f} KiB"
+        print(line)
+
+    baselines = load_baselines()
+    if args.update_baseline:
+        baselines.setdefault(args.scale, {}).update(results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines for '{args.scale}' written to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baselines.get(args.scale, {}), args.tolerance, args.size_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
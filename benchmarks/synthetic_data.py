@@ -0,0 +1,139 @@
+"""Synthetic rainfall sheets for exercising the dashboard without Google credentials.
+
+The generators emit rows shaped like ``worksheet.get_all_records()`` output for the
+``master24hrs_<date>`` and ``2hrs_master_<date>`` tabs, grouped into workbooks named
+the way the dashboard looks them up (``24HR_Rainfall_<Month>_<Year>`` and
+``2HR_Rainfall_<Month>_<Year>``).
+"""
+import csv
+import json
+import os
+from datetime import timedelta
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TALUKA_CSV = os.path.join(REPO_ROOT, "gujarat_taluka_coordinates.csv")
+
+TIME_SLOTS = ['06TO08', '08TO10', '10TO12', '12TO14', '14TO16', '16TO18',
+              '18TO20', '20TO22', '22TO24', '24TO02', '02TO04', '04TO06']
+
+# Number of sub-districts per scale. "india" roughly matches the census sub-district count.
+SCALES = {
+    "gujarat": 251,
+    "india": 6000,
+}
+
+
+def make_talukas(scale="gujarat"):
+    """Returns a list of (district, taluka) pairs for the given scale."""
+    count = SCALES[scale]
+    talukas = []
+    if scale == "gujarat" and os.path.exists(TALUKA_CSV):
+        with open(TALUKA_CSV, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                talukas.append((row["District"], row["Taluka"]))
+    while len(talukas) < count:
+        i = len(talukas)
+        talukas.append((f"District {i // 25:03d}", f"Subdistrict {i:05d}"))
+    return talukas[:count]
+
+
+def sample_rainfall(rng, size, wet_fraction=0.55):
+    """Draws rainfall amounts (mm) with a realistic share of dry talukas and a heavy tail."""
+    amounts = rng.lognormal(mean=2.0, sigma=1.3, size=size)
+    amounts[rng.random(size) > wet_fraction] = 0.0
+    return np.round(amounts, 1)
+
+
+def make_daily_records(talukas, rng):
+    """Builds rows for a ``master24hrs_<date>`` tab."""
+    totals = sample_rainfall(rng, len(talukas))
+    seasonal = np.round(totals * 1.5 + rng.uniform(50, 900, size=len(talukas)), 1)
+    records = []
+    for (district, taluka), total, season in zip(talukas, totals, seasonal):
+        records.append({
+            "DISTRICT": district,
+            "TALUKA": taluka,
+            "TOTAL": float(total),
+            "Total_Rainfall": float(season),
+            "Percent_Against_Avg": round(float(season) / 700 * 100, 2),
+        })
+    return records
+
+
+def make_hourly_records(talukas, rng, filled_slots=len(TIME_SLOTS)):
+    """Builds rows for a ``2hrs_master_<date>`` tab.
+
+    Slots after ``filled_slots`` are left as empty strings, the way Sheets returns
+    cells that have not been filled in yet.
+    """
+    values = sample_rainfall(rng, len(talukas) * len(TIME_SLOTS), wet_fraction=0.2)
+    values = (values / 4).round(1).reshape(len(talukas), len(TIME_SLOTS))
+    records = []
+    for (district, taluka), row in zip(talukas, values):
+        record = {"DISTRICT": district, "TALUKA": taluka}
+        for i, slot in enumerate(TIME_SLOTS):
+            record[slot] = float(row[i]) if i < filled_slots else ""
+        records.append(record)
+    return records
+
+
+def daily_sheet_name(date):
+    return f"24HR_Rainfall_{date.strftime('%B')}_{date.strftime('%Y')}"
+
+
+def daily_tab_name(date):
+    return f"master24hrs_{date.strftime('%Y-%m-%d')}"
+
+
+def hourly_sheet_name(date):
+    return f"2HR_Rainfall_{date.strftime('%B')}_{date.strftime('%Y')}"
+
+
+def hourly_tab_name(date):
+    return f"2hrs_master_{date.strftime('%Y-%m-%d')}"
+
+
+def make_workbooks(start_date, days=1, scale="gujarat", seed=0):
+    """Builds ``{sheet_name: {tab_name: records}}`` for a date range.
+
+    Use ``days=365 * n`` for multi-year histories; every date gets both a daily and
+    a 2-hourly tab.
+    """
+    rng = np.random.default_rng(seed)
+    talukas = make_talukas(scale)
+    workbooks = {}
+    for offset in range(days):
+        date = start_date + timedelta(days=offset)
+        workbooks.setdefault(daily_sheet_name(date), {})[daily_tab_name(date)] = make_daily_records(talukas, rng)
+        workbooks.setdefault(hourly_sheet_name(date), {})[hourly_tab_name(date)] = make_hourly_records(talukas, rng)
+    return workbooks
+
+
+def make_taluka_geojson(talukas, cell_size=0.1):
+    """Builds a square-grid FeatureCollection keyed by ``properties.SUB_DISTRICT``.
+
+    The repository does not ship taluka geometry, so this stands in for
+    ``gujarat_taluka_clean.geojson`` with one polygon per taluka.
+    """
+    side = int(np.ceil(np.sqrt(len(talukas))))
+    features = []
+    for i, (district, taluka) in enumerate(talukas):
+        lon = 68.5 + (i % side) * cell_size
+        lat = 20.5 + (i // side) * cell_size
+        ring = [[lon, lat], [lon + cell_size, lat], [lon + cell_size, lat + cell_size],
+                [lon, lat + cell_size], [lon, lat]]
+        features.append({
+            "type": "Feature",
+            "properties": {"SUB_DISTRICT": taluka, "district": district},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def write_taluka_geojson(path, talukas):
+    """Writes :func:`make_taluka_geojson` output to ``path``."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_taluka_geojson(talukas), f)
+    return path
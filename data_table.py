@@ -0,0 +1,128 @@
+"""Arrow-backed data table with server-side sort, filter and paging.
+
+``ArrowTable.from_frame`` converts a DataFrame to an Arrow table once and
+precomputes an ascending and a descending row order for every sortable column.
+Sorting only picks one of those index arrays, filtering only builds a boolean mask,
+and just the visible page is materialized with ``take`` and sent to the browser.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+def _arrow_safe(df):
+    """Casts object columns holding mixed types (e.g. numbers and '' from Sheets) to str."""
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed")
+    ]
+    if not mixed:
+        return df
+    return df.astype({col: str for col in mixed})
+
+
+class ArrowTable:
+    """An Arrow table plus precomputed sort orders, built once per dataset."""
+
+    def __init__(self, table, sort_indices, default_sort=None, default_ascending=True):
+        self.table = table
+        self.sort_indices = sort_indices
+        self.default_sort = default_sort
+        self.default_ascending = default_ascending
+
+    @classmethod
+    def from_frame(cls, df, default_sort=None, default_ascending=True):
+        table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+        sort_indices = {}
+        for name in table.column_names:
+            try:
+                sort_indices[name] = {
+                    # Nulls sort last in both directions (Arrow's default).
+                    ascending: pc.sort_indices(
+                        table, sort_keys=[(name, "ascending" if ascending else "descending")]
+                    )
+                    for ascending in (True, False)
+                }
+            except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+                continue
+        return cls(table, sort_indices, default_sort, default_ascending)
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    @property
+    def sortable_columns(self):
+        return list(self.sort_indices)
+
+    def row_order(self, sort_by=None, ascending=True, filter_text=""):
+        """Returns the row indices for a sort and filter, without touching the data."""
+        if sort_by in self.sort_indices:
+            order = self.sort_indices[sort_by][ascending]
+        else:
+            order = pa.array(range(self.table.num_rows), type=pa.int64())
+        if filter_text:
+            order = pc.filter(order, pc.take(self.filter_mask(filter_text), order))
+        return order
+
+    def filter_mask(self, filter_text):
+        """True for rows where any text column contains ``filter_text`` (case-insensitive)."""
+        mask = None
+        for column in self.table.columns:
+            if not pa.types.is_string(column.type) and not pa.types.is_large_string(column.type):
+                continue
+            matches = pc.fill_null(pc.match_substring(column, filter_text, ignore_case=True), False)
+            mask = matches if mask is None else pc.or_(mask, matches)
+        if mask is None:
+            return pa.array([False] * self.table.num_rows)
+        return mask
+
+    def page(self, order, page, page_size):
+        """Materializes one page of rows as a DataFrame indexed by 1-based position."""
+        start = page * page_size
+        rows = order[start:start + page_size]
+        df_page = self.table.take(rows).to_pandas()
+        df_page.index = range(start + 1, start + 1 + len(df_page))
+        return df_page
+
+
+def show_data_table(arrow_table, key, height=400):
+    """Renders sort/filter/paging controls and only the visible page of ``arrow_table``."""
+    columns = arrow_table.sortable_columns
+    default_sort = arrow_table.default_sort if arrow_table.default_sort in columns else None
+
+    col_filter, col_sort, col_order, col_size = st.columns([0.4, 0.25, 0.15, 0.2])
+    with col_filter:
+        filter_text = st.text_input("Filter", key=f"{key}_filter", placeholder="District or Taluka")
+    with col_sort:
+        sort_by = st.selectbox(
+            "Sort by", columns, index=columns.index(default_sort) if default_sort else 0, key=f"{key}_sort"
+        ) if columns else None
+    with col_order:
+        ascending = st.selectbox(
+            "Order", ["Ascending", "Descending"],
+            index=0 if arrow_table.default_ascending else 1, key=f"{key}_order"
+        ) == "Ascending"
+    with col_size:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    order = arrow_table.row_order(sort_by, ascending, filter_text.strip())
+    num_pages = max(1, -(-len(order) // page_size))
+    page_key = f"{key}_page"
+    # Keep the page in range when a filter or page size change shrinks the table.
+    if st.session_state.get(page_key, 1) > num_pages:
+        st.session_state[page_key] = num_pages
+    st.session_state.setdefault(page_key, 1)
+    page = st.number_input(
+        f"Page (of {num_pages})", min_value=1, max_value=num_pages, step=1, key=page_key
+    ) - 1
+
+    df_page = arrow_table.page(order, page, page_size)
+    st.dataframe(df_page, use_container_width=True, height=height)
+    if len(order):
+        st.caption(f"Rows {page * page_size + 1}–{page * page_size + len(df_page)} of {len(order)}")
+    else:
+        st.caption("No matching rows")
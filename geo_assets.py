@@ -0,0 +1,106 @@
+"""Precompiled district/taluka geometry.
+
+Parsing the pretty-printed GeoJSON with ``json.load`` on first use is a visible part
+of a cold start. ``compile_geojson`` normalizes a GeoJSON file once (lower-cased
+feature ids, rounded coordinates) and stores it next to the source in ``marshal``
+format, which loads several times faster than JSON. ``read_geojson`` prefers, in
+order: geometry preloaded into this process, an up-to-date compiled file, the
+source GeoJSON.
+"""
+import json
+import marshal
+import os
+import sys
+import tempfile
+
+# ~1 m precision; more digits only inflate the figure payload sent to the browser.
+COORD_PRECISION = 5
+# marshal's format is tied to the interpreter version, so it goes into the file name.
+COMPILED_SUFFIX = f".{sys.implementation.cache_tag}.marshal"
+# Feature properties matched against lower-cased District/Taluka names in the maps.
+ID_PROPERTIES = ("district", "SUB_DISTRICT")
+# Geometry the dashboard maps read, relative to the repository root.
+DASHBOARD_GEOJSON = ("gujarat_district_clean.geojson", "gujarat_taluka_clean.geojson")
+
+_preloaded = {}
+
+
+def compiled_path(path):
+    return path + COMPILED_SUFFIX
+
+
+def _round_coords(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(value, COORD_PRECISION) for value in coords]
+    return [_round_coords(part) for part in coords]
+
+
+def normalize_geojson(geojson_data):
+    """Lower-cases feature id properties and rounds coordinates, in place."""
+    for feature in geojson_data["features"]:
+        properties = feature["properties"]
+        for key in ID_PROPERTIES:
+            if isinstance(properties.get(key), str):
+                properties[key] = properties[key].strip().lower()
+        geometry = feature.get("geometry")
+        if geometry and "coordinates" in geometry:
+            geometry["coordinates"] = _round_coords(geometry["coordinates"])
+    return geojson_data
+
+
+def _load_source(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return normalize_geojson(json.load(f))
+
+
+def compile_geojson(path):
+    """Writes the compiled form of ``path`` and returns the normalized geometry."""
+    geojson_data = _load_source(path)
+    # A temp file per writer, so processes sharing the checkout never rename each
+    # other's half-written output.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".", suffix=".marshal.tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(marshal.dumps(geojson_data))
+        os.replace(tmp_path, compiled_path(path))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return geojson_data
+
+
+def _compiled_is_fresh(path):
+    target = compiled_path(path)
+    return os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path)
+
+
+def read_geojson(path):
+    """Returns normalized geometry for ``path``, or None if the file does not exist."""
+    if os.path.abspath(path) in _preloaded:
+        return _preloaded[os.path.abspath(path)]
+    if not os.path.exists(path):
+        return None
+    if _compiled_is_fresh(path):
+        try:
+            # marshal.loads on the whole buffer is ~10x faster than marshal.load(f).
+            with open(compiled_path(path), "rb") as f:
+                return marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            # Truncated or corrupt compiled file: rebuild it from the source below.
+            pass
+    try:
+        return compile_geojson(path)
+    except OSError:
+        # Read-only deployments can still serve straight from the source file.
+        return _load_source(path)
+
+
+def preload(paths):
+    """Loads geometry into this process so the first session does not pay for it."""
+    for path in paths:
+        geojson_data = read_geojson(path)
+        if geojson_data is not None:
+            _preloaded[os.path.abspath(path)] = geojson_data
@@ -0,0 +1,105 @@
+"""Validation and change detection for sheet tabs, run once per fetch.
+
+:func:`ingest` turns ``get_all_records()``-style rows into a :class:`Tab`: column
+names are normalized (``DISTRICT``/``TALUKA``/``TOTAL``/``Rain_Last_24_Hrs``), the
+required columns are checked, numeric columns are coerced, and a content hash of
+the result is computed. Derived models and figures are keyed on that hash, so a
+refetch that returns the same data reuses everything built from it.
+"""
+import hashlib
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+DAILY = "daily"
+HOURLY = "hourly"
+
+# Applied in order; an alias is skipped when its target column already exists.
+COLUMN_ALIASES = (
+    ("DISTRICT", "District"),
+    ("TALUKA", "Taluka"),
+    ("TOTAL", "Total_mm"),
+    ("Rain_Last_24_Hrs", "Total_mm"),
+)
+REQUIRED_COLUMNS = {
+    DAILY: ("District", "Taluka", "Total_mm"),
+    HOURLY: ("District", "Taluka"),
+}
+NUMERIC_COLUMNS = ("Total_mm", "Total_Rainfall", "Percent_Against_Avg")
+TIME_SLOT_PATTERN = re.compile(r"^\d{2}TO\d{2}$")
+
+Tab = namedtuple("Tab", ["df", "content_hash", "issues"])
+
+
+class SchemaError(ValueError):
+    """Raised when a tab is missing columns the dashboard cannot do without."""
+
+
+def normalize_columns(df):
+    """Strips column names and renames the known aliases to the dashboard's names."""
+    df.columns = [str(name).strip() for name in df.columns]
+    renames = {}
+    for alias, name in COLUMN_ALIASES:
+        if alias in df.columns and name not in df.columns and name not in renames.values():
+            renames[alias] = name
+    return df.rename(columns=renames)
+
+
+def time_slot_columns(df):
+    """Returns the 2-hourly slot columns (``06TO08`` ...) present in ``df``."""
+    return [col for col in df.columns if TIME_SLOT_PATTERN.match(col)]
+
+
+def coerce_numeric(df, columns):
+    """Converts ``columns`` to numbers and describes any non-blank values that were dropped."""
+    issues = []
+    for col in columns:
+        raw = df[col]
+        if pd.api.types.is_numeric_dtype(raw):
+            continue
+        values = pd.to_numeric(raw, errors="coerce")
+        # Only the few values that failed to parse need the (slower) blank check.
+        dropped = raw[values.isna() & raw.notna()]
+        invalid = int((dropped.astype(str).str.strip() != "").sum()) if len(dropped) else 0
+        if invalid:
+            issues.append(f"{invalid} non-numeric value(s) in '{col}' treated as blank")
+        df[col] = values
+    return issues
+
+
+def content_hash(df):
+    """Returns a hex digest of the frame's column names and values, in order."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(df.columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def combine_hashes(parts):
+    """Returns one digest for a sequence of (label, content hash) pairs."""
+    digest = hashlib.blake2b(digest_size=16)
+    for label, part in parts:
+        digest.update(f"{label}={part};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def ingest(records, kind):
+    """Validates and normalizes the rows of a ``kind`` tab (DAILY or HOURLY) into a :class:`Tab`."""
+    df = pd.DataFrame(records)
+    if df.empty:
+        return Tab(df, content_hash(df), [])
+    df = normalize_columns(df)
+
+    missing = [col for col in REQUIRED_COLUMNS[kind] if col not in df.columns]
+    if missing:
+        raise SchemaError(f"Required column(s) {', '.join(repr(col) for col in missing)} not found in the loaded data.")
+    numeric = [col for col in NUMERIC_COLUMNS if col in df.columns]
+    if kind == HOURLY:
+        slots = time_slot_columns(df)
+        if not slots:
+            raise SchemaError("No 2-hourly time slot columns (e.g. '06TO08') found in the loaded data.")
+        numeric += slots
+
+    issues = coerce_numeric(df, numeric)
+    return Tab(df, content_hash(df), issues)
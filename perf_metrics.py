@@ -0,0 +1,398 @@
+"""Per-stage timing, cache and payload metrics for the dashboard.
+
+Everything is recorded in a process-wide registry and exposed three ways:
+
+* a hidden admin panel (``show_admin_panel``), shown when the page is opened with
+  ``?admin=<RAINFALL_ADMIN_TOKEN>``;
+* one JSON log line per script run on the ``rainfall.perf`` logger, written to
+  stderr at ``RAINFALL_PERF_LOG_LEVEL`` (default INFO);
+* Prometheus text format on ``http://<host>:<RAINFALL_METRICS_PORT>/metrics`` when
+  that environment variable is set.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("rainfall.perf")
+
+ADMIN_TOKEN_ENV = "RAINFALL_ADMIN_TOKEN"
+METRICS_PORT_ENV = "RAINFALL_METRICS_PORT"
+MEASURE_PAYLOAD_ENV = "RAINFALL_MEASURE_PAYLOAD"
+LOG_LEVEL_ENV = "RAINFALL_PERF_LOG_LEVEL"
+
+# Prometheus histogram buckets (seconds) shared by every stage.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Recent samples kept per stage for the admin panel's percentiles.
+RECENT_SAMPLES = 500
+# Sessions that have not rerun for this long are dropped from the memory gauge.
+SESSION_IDLE_SECONDS = 3600
+
+
+class _Registry:
+    """Thread-safe store for every metric the dashboard records."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stage_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+            self.stage_sum = defaultdict(float)
+            self.stage_count = defaultdict(int)
+            self.stage_recent = defaultdict(lambda: deque(maxlen=RECENT_SAMPLES))
+            self.cache_lookups = defaultdict(int)
+            self.cache_misses = defaultdict(int)
+            self.payload_bytes = {}
+            self.session_bytes = {}
+            self.events = defaultdict(int)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            buckets = self.stage_buckets[stage]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            buckets[-1] += 1
+            self.stage_sum[stage] += seconds
+            self.stage_count[stage] += 1
+            self.stage_recent[stage].append(seconds)
+
+
+registry = _Registry()
+_local = threading.local()
+
+
+def _percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+@contextmanager
+def timer(stage):
+    """Times the enclosed block and records it under ``stage``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe(stage, elapsed)
+        spans = getattr(_local, "spans", None)
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def timed(stage):
+    """Decorator form of :func:`timer`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrumented_cache(layer, cache_decorator):
+    """Wraps a Streamlit cache decorator so hits and misses are counted per layer.
+
+    Usage: ``@instrumented_cache("sheet", st.cache_data(ttl=3600))``. Lookups are
+    counted outside the cache and misses inside it, so hits are the difference.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def on_miss(*args, **kwargs):
+            cache_miss(layer)
+            with timer(f"{layer}_miss"):
+                return func(*args, **kwargs)
+
+        cached_func = cache_decorator(on_miss)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            cache_lookup(layer)
+            with timer(layer):
+                return cached_func(*args, **kwargs)
+
+        lookup.clear = cached_func.clear
+        return lookup
+    return decorate
+
+
+def cache_lookup(layer):
+    """Counts one lookup in cache ``layer``; pair each miss with :func:`cache_miss`."""
+    with registry.lock:
+        registry.cache_lookups[layer] += 1
+
+
+def cache_miss(layer):
+    """Counts one miss in cache ``layer``; hits are lookups minus misses."""
+    with registry.lock:
+        registry.cache_misses[layer] += 1
+
+
+def count(event):
+    """Increments the counter for ``event`` (retries, coalesced calls, stale serves...)."""
+    with registry.lock:
+        registry.events[event] += 1
+
+
+def payload_measurement_enabled():
+    """Payload sizes cost a full figure serialization, so they are opt-in."""
+    return os.environ.get(MEASURE_PAYLOAD_ENV) == "1" or getattr(_local, "admin", False)
+
+
+def plotly_chart(fig, name, **kwargs):
+    """Calls ``st.plotly_chart`` and records the figure's JSON payload size under ``name``."""
+    if payload_measurement_enabled():
+        with registry.lock:
+            registry.payload_bytes[name] = len(fig.to_json().encode("utf-8"))
+    with timer("plotly_chart"):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else "bare"
+    except Exception:
+        return "unknown"
+
+
+def _session_state_bytes(session_state):
+    total = 0
+    for key in list(session_state.keys()):
+        # ingest.Tab and similar wrappers hold their frame in ``df``.
+        value = getattr(session_state[key], "df", session_state[key])
+        if hasattr(value, "memory_usage"):
+            total += int(value.memory_usage(deep=True).sum())
+    return total
+
+
+def process_rss_bytes():
+    """Returns the resident set size of this process, or 0 where unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return 0
+
+
+_logger_lock = threading.Lock()
+
+
+def configure_logger():
+    """Attaches a stderr handler to ``rainfall.perf`` once per process.
+
+    ``streamlit run`` leaves the root logger unconfigured, so without this the INFO
+    run summaries would be dropped.
+    """
+    with _logger_lock:
+        if logger.handlers:
+            return
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(os.environ.get(LOG_LEVEL_ENV, "INFO").upper())
+        # serve.py configures the root logger too; don't print every line twice.
+        logger.propagate = False
+
+
+@contextmanager
+def script_run(session_state):
+    """Wraps one script run: times it, tracks session memory and logs a JSON summary."""
+    configure_logger()
+    query_token = st.query_params.get("admin")
+    admin_token = os.environ.get(ADMIN_TOKEN_ENV)
+    _local.admin = bool(admin_token) and query_token == admin_token
+    _local.spans = []
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe("script_run", elapsed)
+        session_id = _session_id()
+        now = time.time()
+        session_bytes = _session_state_bytes(session_state)
+        with registry.lock:
+            registry.session_bytes[session_id] = (session_bytes, now)
+            for sid, (_, seen) in list(registry.session_bytes.items()):
+                if now - seen > SESSION_IDLE_SECONDS:
+                    del registry.session_bytes[sid]
+        logger.info(json.dumps({
+            "event": "script_run",
+            "session": session_id,
+            "seconds": round(elapsed, 4),
+            "stages": [{"stage": stage, "seconds": round(seconds, 4)} for stage, seconds in _local.spans],
+            "session_bytes": session_bytes,
+        }))
+        _local.spans = None
+
+
+def is_admin():
+    """True when the current run was opened with a valid ``?admin=`` token."""
+    return getattr(_local, "admin", False)
+
+
+def snapshot():
+    """Returns the current metrics as plain dicts, for the admin panel and exports."""
+    with registry.lock:
+        stages = {
+            stage: {
+                "count": registry.stage_count[stage],
+                "mean_s": registry.stage_sum[stage] / registry.stage_count[stage],
+                "p50_s": _percentile(registry.stage_recent[stage], 0.5),
+                "p95_s": _percentile(registry.stage_recent[stage], 0.95),
+            }
+            for stage in registry.stage_count
+        }
+        caches = {
+            layer: {
+                "lookups": registry.cache_lookups[layer],
+                "misses": registry.cache_misses[layer],
+                "hits": registry.cache_lookups[layer] - registry.cache_misses[layer],
+            }
+            for layer in registry.cache_lookups
+        }
+        payloads = dict(registry.payload_bytes)
+        events = dict(registry.events)
+        sessions = {sid: size for sid, (size, _) in registry.session_bytes.items()}
+    return {
+        "stages": stages,
+        "caches": caches,
+        "payload_bytes": payloads,
+        "events": events,
+        "session_bytes": sessions,
+        "process_rss_bytes": process_rss_bytes(),
+    }
+
+
+def render_prometheus():
+    """Formats the registry in the Prometheus text exposition format."""
+    lines = [
+        "# HELP rainfall_stage_seconds Wall time per dashboard stage.",
+        "# TYPE rainfall_stage_seconds histogram",
+    ]
+    with registry.lock:
+        for stage in sorted(registry.stage_count):
+            buckets = registry.stage_buckets[stage]
+            for bound, count in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f'rainfall_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'rainfall_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {buckets[-1]}')
+            lines.append(f'rainfall_stage_seconds_sum{{stage="{stage}"}} {registry.stage_sum[stage]}')
+            lines.append(f'rainfall_stage_seconds_count{{stage="{stage}"}} {registry.stage_count[stage]}')
+        lines += ["# HELP rainfall_cache_lookups_total Cache lookups per layer.",
+                  "# TYPE rainfall_cache_lookups_total counter"]
+        lines += [f'rainfall_cache_lookups_total{{layer="{layer}"}} {count}'
+                  for layer, count in sorted(registry.cache_lookups.items())]
+        lines += ["# HELP rainfall_cache_misses_total Cache misses per layer.",
+                  "# TYPE rainfall_cache_misses_total counter"]
+        lines += [f'rainfall_cache_misses_total{{layer="{layer}"}} {count}'
+                  for layer, count in sorted(registry.cache_misses.items())]
+        lines += ["# HELP rainfall_events_total Counted events such as Sheets retries.",
+                  "# TYPE rainfall_events_total counter"]
+        lines += [f'rainfall_events_total{{event="{event}"}} {total}'
+                  for event, total in sorted(registry.events.items())]
+        lines += ["# HELP rainfall_chart_payload_bytes Last serialized size of each chart.",
+                  "# TYPE rainfall_chart_payload_bytes gauge"]
+        lines += [f'rainfall_chart_payload_bytes{{chart="{name}"}} {size}'
+                  for name, size in sorted(registry.payload_bytes.items())]
+        session_sizes = [size for size, _ in registry.session_bytes.values()]
+    lines += ["# HELP rainfall_sessions Sessions seen in the last hour.",
+              "# TYPE rainfall_sessions gauge",
+              f"rainfall_sessions {len(session_sizes)}",
+              "# HELP rainfall_session_state_bytes Data held in session state across sessions.",
+              "# TYPE rainfall_session_state_bytes gauge",
+              f"rainfall_session_state_bytes {sum(session_sizes)}",
+              "# HELP rainfall_process_rss_bytes Resident memory of this process.",
+              "# TYPE rainfall_process_rss_bytes gauge",
+              f"rainfall_process_rss_bytes {process_rss_bytes()}"]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@st.cache_resource
+def start_metrics_server():
+    """Starts the Prometheus endpoint once per process if ``RAINFALL_METRICS_PORT`` is set."""
+    port = os.environ.get(METRICS_PORT_ENV)
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+    except (OSError, ValueError) as e:
+        logger.warning("Metrics server not started on port %s: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def show_admin_panel():
+    """Renders the performance debug panel for admin sessions."""
+    if not is_admin():
+        return
+    data = snapshot()
+    with st.expander("🛠️ Performance debug panel", expanded=False):
+        st.markdown("**Stage timings**")
+        st.dataframe(
+            [{"Stage": stage, "Count": s["count"], "Mean (ms)": round(s["mean_s"] * 1000, 1),
+              "p50 (ms)": round(s["p50_s"] * 1000, 1), "p95 (ms)": round(s["p95_s"] * 1000, 1)}
+             for stage, s in sorted(data["stages"].items())],
+            use_container_width=True
+        )
+        st.markdown("**Cache layers**")
+        st.dataframe(
+            [{"Layer": layer, **counts} for layer, counts in sorted(data["caches"].items())],
+            use_container_width=True
+        )
+        st.markdown("**Events**")
+        st.dataframe(
+            [{"Event": event, "Count": total} for event, total in sorted(data["events"].items())],
+            use_container_width=True
+        )
+        st.markdown("**Chart payloads**")
+        st.dataframe(
+            [{"Chart": name, "KiB": round(size / 1024, 1)} for name, size in sorted(data["payload_bytes"].items())],
+            use_container_width=True
+        )
+        st.markdown(
+            f"**Memory:** process RSS {data['process_rss_bytes'] / 2**20:.1f} MiB, "
+            f"{len(data['session_bytes'])} session(s) holding "
+            f"{sum(data['session_bytes'].values()) / 2**20:.2f} MiB of data"
+        )
+        if st.button("Reset metrics", key="perf_reset_btn"):
+            registry.reset()
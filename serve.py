@@ -0,0 +1,72 @@
+"""Startup-optimized launcher: warms the process, then serves app.py.
+
+    python serve.py                  # warm up, then run Streamlit in this process
+    python serve.py --compile-only   # only write the precompiled geometry (e.g. at image build)
+
+Streamlit only executes app.py once a session connects, so a plain
+``streamlit run`` makes the first user pay for heavy imports and geometry parsing.
+Running the server from this process after ``warmup()`` means those modules are
+already in ``sys.modules`` and the geometry is preloaded before the instance is
+marked ready. Streamlit options are read from ``.streamlit/config.toml`` or
+``STREAMLIT_*`` environment variables.
+"""
+import logging
+import os
+import sys
+import time
+
+import geo_assets
+
+logger = logging.getLogger("rainfall.serve")
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = (
+    "pandas",
+    "plotly.express",
+    "plotly.graph_objects",
+    "gspread",
+    "google.oauth2.service_account",
+)
+
+
+def warmup():
+    """Imports the heavy modules and preloads geometry; returns seconds spent per step."""
+    import importlib
+
+    timings = {}
+    for name in HEAVY_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - start
+    start = time.perf_counter()
+    geo_assets.preload(os.path.join(REPO_ROOT, path) for path in geo_assets.DASHBOARD_GEOJSON)
+    timings["geometry"] = time.perf_counter() - start
+    return timings
+
+
+def compile_assets():
+    for path in geo_assets.DASHBOARD_GEOJSON:
+        full_path = os.path.join(REPO_ROOT, path)
+        if os.path.exists(full_path):
+            geo_assets.compile_geojson(full_path)
+            logger.info("Compiled %s", geo_assets.compiled_path(full_path))
+
+
+def main(argv):
+    logging.basicConfig(level=logging.INFO)
+    os.chdir(REPO_ROOT)
+    if "--compile-only" in argv:
+        compile_assets()
+        return
+
+    for step, seconds in warmup().items():
+        logger.info("Warmup %-32s %7.1f ms", step, seconds * 1000)
+
+    from streamlit.web import bootstrap
+
+    bootstrap.load_config_options(flag_options={})
+    bootstrap.run(os.path.join(REPO_ROOT, "app.py"), False, [], {})
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
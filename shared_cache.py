@@ -0,0 +1,273 @@
+"""Out-of-process cache shared by dashboard replicas.
+
+``st.cache_data`` stays the first-level, per-process cache; this module is the
+second level, so replicas behind a load balancer reuse each other's Sheets fetches
+and derived models. The backend is chosen with ``RAINFALL_CACHE_URL``:
+
+* ``memory://`` (default) - per process, same behaviour as before;
+* ``sqlite:///path/to/cache.db`` - a file on a volume shared by replicas on one host;
+* ``redis://host:6379/0`` - needs the optional ``redis`` package.
+
+``get_or_compute`` coalesces concurrent misses for the same key through a lock held
+in the backend, so a burst of sessions triggers one upstream fetch cluster-wide.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import closing
+
+import perf_metrics
+
+CACHE_URL_ENV = "RAINFALL_CACHE_URL"
+KEY_PREFIX = "rainfall:v2:"
+# Expired entries are kept this long so callers can still serve them while stale.
+STALE_RETENTION_SECONDS = 24 * 3600
+# Entries kept by MemoryBackend before the least recently used ones are dropped.
+MEMORY_MAX_ENTRIES = 512
+
+Entry = namedtuple("Entry", ["value", "stored_at", "expires_at"])
+
+
+def make_key(*parts):
+    """Builds a namespaced cache key from ``parts``."""
+    return KEY_PREFIX + "|".join(str(part) for part in parts)
+
+
+def metrics_layer(key):
+    """Names the perf_metrics cache layer for ``key``, e.g. ``shared_sheet``."""
+    return "shared_" + key[len(KEY_PREFIX):].split("|", 1)[0]
+
+
+def is_fresh(entry, now=None):
+    return entry is not None and (now or time.time()) < entry.expires_at
+
+
+class MemoryBackend:
+    """Per-process backend; locks only coordinate threads of this process.
+
+    Holds at most ``max_entries`` entries, dropping the least recently used first.
+    """
+
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._locks = {}
+        self._mutex = threading.Lock()
+
+    def get(self, key):
+        with self._mutex:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() > entry.expires_at + STALE_RETENTION_SECONDS:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._mutex:
+            self._entries[key] = Entry(value, now, now + ttl)
+            self._entries.move_to_end(key)
+            expired = [k for k, e in self._entries.items() if e.expires_at < now - STALE_RETENTION_SECONDS]
+            for k in expired:
+                del self._entries[k]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def try_lock(self, key, ttl):
+        now = time.time()
+        with self._mutex:
+            holder = self._locks.get(key)
+            if holder is not None and holder[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[key] = (token, now + ttl)
+            return token
+
+    def release(self, key, token):
+        with self._mutex:
+            if self._locks.get(key, (None,))[0] == token:
+                del self._locks[key]
+
+    def clear(self):
+        with self._mutex:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """Backend stored in a SQLite file; replicas on one host share it through a volume."""
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, stored_at REAL, expires_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT, expires_at REAL)"
+            )
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across threads and processes.
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, stored_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() > row[2] + STALE_RETENTION_SECONDS:
+            return None
+        return Entry(pickle.loads(row[0]), row[1], row[2])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now, now + ttl),
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE expires_at < ?", (now - STALE_RETENTION_SECONDS,)
+            )
+
+    def try_lock(self, key, ttl):
+        now = time.time()
+        token = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM locks WHERE key = ? AND expires_at < ?", (key, now))
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO locks (key, token, expires_at) VALUES (?, ?, ?)",
+                (key, token, now + ttl),
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return token if acquired else None
+
+    def release(self, key, token):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+    def clear(self):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM entries")
+
+
+class RedisBackend:
+    """Backend on a Redis server shared by every replica."""
+
+    # Deletes the lock only if this caller still holds it.
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self.client.get(key)
+        if raw is None:
+            return None
+        return Entry(*pickle.loads(raw))
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        payload = pickle.dumps((value, now, now + ttl), protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(key, payload, px=int((ttl + STALE_RETENTION_SECONDS) * 1000))
+
+    def try_lock(self, key, ttl):
+        token = uuid.uuid4().hex
+        if self.client.set(key + ":lock", token, nx=True, px=int(ttl * 1000)):
+            return token
+        return None
+
+    def release(self, key, token):
+        self.client.eval(self.RELEASE_SCRIPT, 1, key + ":lock", token)
+
+    def clear(self):
+        for key in self.client.scan_iter(KEY_PREFIX + "*"):
+            self.client.delete(key)
+
+
+def backend_from_url(url):
+    """Creates the backend described by ``url``."""
+    if not url or url == "memory://":
+        return MemoryBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported {CACHE_URL_ENV}: {url}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Returns the process-wide backend configured by ``RAINFALL_CACHE_URL``."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = backend_from_url(os.environ.get(CACHE_URL_ENV, "memory://"))
+        return _backend
+
+
+def set_backend(backend):
+    """Replaces the process-wide backend (used by benchmarks and tooling)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def get_or_compute(key, compute, ttl, should_cache=None, lock_ttl=60, poll_interval=0.1, backend=None):
+    """Returns the fresh cached value for ``key``, computing it at most once cluster-wide.
+
+    The caller that wins the backend lock runs ``compute()``; everyone else polls
+    until its result lands or the lock expires, then computes on their own.
+    Results for which ``should_cache(value)`` is false are returned but not stored.
+    Lookups and computes are counted in perf_metrics under :func:`metrics_layer`.
+    """
+    backend = backend or get_backend()
+    layer = metrics_layer(key)
+    perf_metrics.cache_lookup(layer)
+    entry = backend.get(key)
+    if is_fresh(entry):
+        return entry.value
+
+    deadline = time.monotonic() + lock_ttl
+    while True:
+        token = backend.try_lock(key, lock_ttl)
+        if token is not None:
+            try:
+                entry = backend.get(key)
+                if is_fresh(entry):
+                    return entry.value
+                perf_metrics.cache_miss(layer)
+                value = compute()
+                if should_cache is None or should_cache(value):
+                    backend.set(key, value, ttl)
+                return value
+            finally:
+                backend.release(key, token)
+        time.sleep(poll_interval)
+        entry = backend.get(key)
+        if is_fresh(entry):
+            return entry.value
+        if time.monotonic() > deadline:
+            perf_metrics.cache_miss(layer)
+            return compute()
@@ -0,0 +1,288 @@
+"""Rate-limited, coalesced access to Google Sheets.
+
+Every Sheets API call made by the dashboard goes through :func:`call_api`, which
+takes a token from a process-wide token bucket and retries 429 and 5xx responses
+with exponential backoff and full jitter. :func:`load` sits on top of the shared
+cache: identical (sheet, tab) requests in this process share one in-flight fetch,
+and when Sheets is throttling us a stale cached copy is served while a background
+thread revalidates it.
+
+Quota settings come from the environment so they can be split across replicas:
+``RAINFALL_SHEETS_REQUESTS_PER_MINUTE`` (default 60, the per-user read quota) and
+``RAINFALL_SHEETS_BURST`` (default 10).
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+
+import perf_metrics
+import shared_cache
+
+logger = logging.getLogger("rainfall.sheets")
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 32.0
+# How long a foreground request may wait for a rate-limit token before giving up.
+MAX_TOKEN_WAIT_SECONDS = 20.0
+# open() + worksheet() + get_all_records() each cost one API request.
+REQUESTS_PER_FETCH = 3
+# Both fetch paths read raw cell values, so a tab gets the same records (and content
+# hash) whichever view fetched it, independent of each cell's display format.
+VALUE_RENDER_OPTION = "UNFORMATTED_VALUE"
+# Lock held by a foreground refresh of a stale entry (one attempt, no backoff).
+REFRESH_LOCK_SECONDS = 60
+
+Result = namedtuple("Result", ["value", "stale", "stored_at"])
+
+
+class SheetsThrottled(Exception):
+    """Raised when Sheets quota is exhausted and no cached copy can stand in."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self):
+        with self._cond:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, tokens=1, timeout=None):
+        """Takes ``tokens``, waiting up to ``timeout`` seconds; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers share its result or error."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"event": threading.Event()}
+        if not leader:
+            perf_metrics.count("sheets_coalesced")
+            call["event"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["value"]
+        try:
+            call["value"] = func()
+            return call["value"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["event"].set()
+
+
+limiter = TokenBucket(
+    rate=float(os.environ.get("RAINFALL_SHEETS_REQUESTS_PER_MINUTE", "60")) / 60,
+    capacity=float(os.environ.get("RAINFALL_SHEETS_BURST", "10")),
+)
+_single_flight = SingleFlight()
+_revalidating = SingleFlight()
+
+
+def status_code(error):
+    """Returns the HTTP status of a gspread/requests error, if it carries one."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code > 0:
+        return code
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_throttled(error):
+    return isinstance(error, SheetsThrottled) or status_code(error) in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given zero-based retry attempt."""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def call_api(func, *args, max_attempts=MAX_ATTEMPTS, token_timeout=MAX_TOKEN_WAIT_SECONDS, **kwargs):
+    """Calls one Sheets API method under the rate limiter, retrying throttling errors."""
+    for attempt in range(max_attempts):
+        if not limiter.acquire(timeout=token_timeout):
+            perf_metrics.count("sheets_rate_limited")
+            raise SheetsThrottled("Google Sheets request quota exhausted; try again shortly.")
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if status_code(e) not in RETRYABLE_STATUS or attempt == max_attempts - 1:
+                raise
+            delay = backoff_delay(attempt)
+            perf_metrics.count("sheets_retry")
+            logger.warning("Sheets call failed with %s; retry %d in %.1fs", status_code(e), attempt + 1, delay)
+            time.sleep(delay)
+
+
+def fetch_records(client, sheet_name, tab_name, max_attempts=MAX_ATTEMPTS, token_timeout=MAX_TOKEN_WAIT_SECONDS):
+    """Returns ``get_all_records()`` for a tab, with every API call rate limited."""
+    options = {"max_attempts": max_attempts, "token_timeout": token_timeout}
+    spreadsheet = call_api(client.open, sheet_name, **options)
+    worksheet = call_api(spreadsheet.worksheet, tab_name, **options)
+    return call_api(worksheet.get_all_records, value_render_option=VALUE_RENDER_OPTION, **options)
+
+
+def records_from_values(values):
+    """Turns a header row plus data rows into the records ``get_all_records()`` returns.
+
+    Rows are padded to the header width and numericised exactly as gspread does.
+    """
+    from gspread.utils import numericise_all, to_records
+
+    if not values:
+        return []
+    header = values[0]
+    rows = [
+        numericise_all(list(row) + [""] * (len(header) - len(row)))
+        for row in values[1:]
+    ]
+    return to_records(header, rows)
+
+
+def fetch_tabs(client, sheet_name, tab_names, max_attempts=MAX_ATTEMPTS, token_timeout=MAX_TOKEN_WAIT_SECONDS):
+    """Returns ``{tab: records}`` for several tabs of one spreadsheet in three API calls.
+
+    The tab list is read once and all wanted tabs come back in a single
+    ``values_batch_get``; tabs that do not exist are left out of the result.
+    """
+    from gspread.utils import absolute_range_name
+
+    options = {"max_attempts": max_attempts, "token_timeout": token_timeout}
+    spreadsheet = call_api(client.open, sheet_name, **options)
+    existing = {worksheet.title for worksheet in call_api(spreadsheet.worksheets, **options)}
+    wanted = [tab_name for tab_name in tab_names if tab_name in existing]
+    if not wanted:
+        return {}
+    response = call_api(
+        spreadsheet.values_batch_get,
+        [absolute_range_name(tab_name) for tab_name in wanted],
+        params={"valueRenderOption": VALUE_RENDER_OPTION},
+        **options
+    )
+    return {
+        tab_name: records_from_values(value_range.get("values", []))
+        for tab_name, value_range in zip(wanted, response.get("valueRanges", []))
+    }
+
+
+def _revalidate_in_background(key, fetch, ttl, should_cache):
+    if _revalidating.in_flight(key):
+        return
+
+    def run():
+        try:
+            _revalidating.do(key, lambda: shared_cache.get_or_compute(key, fetch, ttl, should_cache=should_cache))
+        except Exception as e:
+            logger.warning("Background revalidation of %s failed: %s", key, e)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def _serve_stale(key, entry, fetch, ttl, should_cache):
+    perf_metrics.count("sheets_served_stale")
+    _revalidate_in_background(key, fetch, ttl, should_cache)
+    return Result(entry.value, True, entry.stored_at)
+
+
+def _refresh_stale(backend, key, entry, fetch, ttl, should_cache):
+    """Refreshes a stale entry with one attempt, or returns it if anyone else is refreshing.
+
+    Unlike ``shared_cache.get_or_compute`` this never waits on the backend lock: the
+    holder may be a revalidation or another replica sitting in full backoff.
+    """
+    token = backend.try_lock(key, REFRESH_LOCK_SECONDS)
+    if token is None:
+        perf_metrics.count("sheets_served_stale")
+        return Result(entry.value, True, entry.stored_at)
+    try:
+        current = backend.get(key)
+        if shared_cache.is_fresh(current):
+            return Result(current.value, False, current.stored_at)
+        # A stale copy can stand in, so don't keep the user waiting through backoff.
+        value = fetch(max_attempts=1, token_timeout=0)
+        if should_cache is None or should_cache(value):
+            backend.set(key, value, ttl)
+        return Result(value, False, time.time())
+    except Exception as e:
+        if not is_throttled(e):
+            raise
+    finally:
+        backend.release(key, token)
+    # Only reached when the refresh was throttled; the lock is free for the revalidation.
+    return _serve_stale(key, entry, fetch, ttl, should_cache)
+
+
+def load(key, fetch, ttl, should_cache=None):
+    """Returns a :class:`Result` for ``key`` from the shared cache, fetching on a miss.
+
+    ``fetch`` accepts the ``max_attempts`` and ``token_timeout`` keywords of
+    :func:`fetch_records`. A stale cached copy is returned with ``stale=True``,
+    without waiting, when Sheets is throttling us (no rate-limit tokens left, or
+    the refresh fails with 429/5xx) or when another caller is already refreshing
+    it; throttled copies are refreshed in the background with full retries.
+    """
+    backend = shared_cache.get_backend()
+    entry = backend.get(key)
+    layer = shared_cache.metrics_layer(key)
+    if shared_cache.is_fresh(entry):
+        perf_metrics.cache_lookup(layer)
+        return Result(entry.value, False, entry.stored_at)
+
+    if entry is not None:
+        # Cold misses are counted by shared_cache.get_or_compute instead.
+        perf_metrics.cache_lookup(layer)
+        perf_metrics.cache_miss(layer)
+        if limiter.available() < REQUESTS_PER_FETCH:
+            return _serve_stale(key, entry, fetch, ttl, should_cache)
+        return _refresh_stale(backend, key, entry, fetch, ttl, should_cache)
+
+    value = _single_flight.do(
+        key, lambda: shared_cache.get_or_compute(key, fetch, ttl, should_cache=should_cache)
+    )
+    return Result(value, False, time.time())
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared_cache  # noqa: E402
+import sheets_access  # noqa: E402
+
+
+@pytest.fixture
+def backend():
+    """A fresh in-memory shared cache, installed for the duration of the test."""
+    previous = shared_cache._backend
+    memory = shared_cache.MemoryBackend()
+    shared_cache.set_backend(memory)
+    yield memory
+    shared_cache.set_backend(previous)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """An effectively unlimited token bucket, so tests don't wait on the Sheets quota."""
+    bucket = sheets_access.TokenBucket(rate=1e9, capacity=1e9)
+    monkeypatch.setattr(sheets_access, "limiter", bucket)
+    return bucket
@@ -0,0 +1,26 @@
+import math
+
+import pytest
+
+import app
+
+BOUNDARY_VALUES = [-5, -1, -0.01, 0, 0.01, 2.4, 2.41, 7.5, 7.51, 35.5, 64.4, 124.4, 244.4, 350, 350.01, math.nan]
+
+
+@pytest.mark.parametrize("value", BOUNDARY_VALUES)
+def test_classify_rainfall_matches_vectorized(value):
+    code = app.classify_rainfall_codes([value])[0]
+    assert app.classify_rainfall(value) == app.ordered_categories[code]
+
+
+@pytest.mark.parametrize("value, category", [
+    (-1, "No Rain"),
+    (0, "No Rain"),
+    (math.nan, "No Rain"),
+    (2.4, "Very Light"),
+    (2.41, "Light"),
+    (350, "Extremely Heavy"),
+    (350.01, "Exceptional"),
+])
+def test_classify_rainfall_boundaries(value, category):
+    assert app.classify_rainfall(value) == category
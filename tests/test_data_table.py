@@ -0,0 +1,77 @@
+import math
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+import data_table
+
+
+def make_table():
+    df = pd.DataFrame({
+        "District": ["Surat", "Kutch", "Surat", "Dang"],
+        "Taluka": ["Olpad", "Bhuj", "Kamrej", "Ahwa"],
+        "Total_mm": [12.5, None, 0.0, 40.0],
+    })
+    return data_table.ArrowTable.from_frame(df)
+
+
+def talukas(table, order):
+    return table.page(order, 0, 10)["Taluka"].tolist()
+
+
+def test_unsorted_order_keeps_the_input_rows():
+    table = make_table()
+    assert talukas(table, table.row_order()) == ["Olpad", "Bhuj", "Kamrej", "Ahwa"]
+
+
+def test_sort_puts_nulls_last_in_both_directions():
+    table = make_table()
+    assert talukas(table, table.row_order("Total_mm", ascending=True)) == ["Kamrej", "Olpad", "Ahwa", "Bhuj"]
+    assert talukas(table, table.row_order("Total_mm", ascending=False)) == ["Ahwa", "Olpad", "Kamrej", "Bhuj"]
+
+
+def test_filter_matches_any_text_column_case_insensitively():
+    table = make_table()
+    assert talukas(table, table.row_order(filter_text="SURAT")) == ["Olpad", "Kamrej"]
+    assert talukas(table, table.row_order(filter_text="bhu")) == ["Bhuj"]
+
+
+def test_filter_keeps_the_sort_order():
+    table = make_table()
+    order = table.row_order("Taluka", ascending=False, filter_text="surat")
+    assert talukas(table, order) == ["Olpad", "Kamrej"]
+
+
+def test_filter_without_matches_is_empty():
+    table = make_table()
+    assert len(table.row_order(filter_text="Ahmedabad")) == 0
+
+
+def test_page_is_indexed_by_position():
+    table = make_table()
+    df_page = table.page(table.row_order("Taluka"), 1, 3)
+    assert df_page["Taluka"].tolist() == ["Olpad"]
+    assert list(df_page.index) == [4]
+    assert math.isclose(df_page["Total_mm"].iloc[0], 12.5)
+
+
+def test_mixed_object_columns_are_converted_to_text():
+    df = pd.DataFrame({"Taluka": ["Olpad", "Bhuj"], "Note": [5, ""]})
+    table = data_table.ArrowTable.from_frame(df)
+    assert table.page(table.row_order(), 0, 10)["Note"].tolist() == ["5", ""]
+
+
+def render_table():
+    import pandas as pd
+
+    import data_table
+
+    df = pd.DataFrame({"District": ["Surat", "Kutch"], "Taluka": ["Olpad", "Bhuj"]})
+    data_table.show_data_table(data_table.ArrowTable.from_frame(df), key="table")
+
+
+def test_show_data_table_reports_no_matching_rows():
+    app = AppTest.from_function(render_table).run()
+    assert app.caption[0].value == "Rows 1–2 of 2"
+    app.text_input(key="table_filter").input("Ahmedabad").run()
+    assert app.caption[0].value == "No matching rows"
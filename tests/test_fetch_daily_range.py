@@ -0,0 +1,81 @@
+import datetime
+import time
+
+import app
+import shared_cache
+from benchmarks import synthetic_data
+from benchmarks.fake_gspread import FakeGspreadClient
+
+START = datetime.date(2025, 7, 15)
+DATES = [START + datetime.timedelta(days=offset) for offset in range(3)]
+
+
+def make_client():
+    return FakeGspreadClient(synthetic_data.make_workbooks(START, days=len(DATES)))
+
+
+def sheet_key(date):
+    return shared_cache.make_key("sheet", *app.daily_sheet_and_tab(date))
+
+
+def store_stale(backend, client):
+    frames, _, _ = app.fetch_daily_range(client, DATES)
+    for date, tab in frames.items():
+        backend.set(sheet_key(date), tab, ttl=-1)
+    return frames
+
+
+def test_fetches_each_spreadsheet_once(backend, limiter):
+    client = make_client()
+    frames, issues, throttled = app.fetch_daily_range(client, DATES)
+    assert sorted(frames) == DATES
+    assert not throttled
+    assert client.calls["values_batch_get"] == 1
+    assert all(shared_cache.is_fresh(backend.get(sheet_key(date))) for date in DATES)
+
+
+def test_stale_days_are_refreshed_with_one_attempt(backend, limiter, monkeypatch):
+    client = make_client()
+    store_stale(backend, client)
+    monkeypatch.setattr(app.sheets_access, "backoff_delay", lambda attempt: 60)
+    client.fail_next(1)
+    start = time.monotonic()
+    frames, _, throttled = app.fetch_daily_range(client, DATES)
+    assert time.monotonic() - start < 5
+    assert throttled
+    assert sorted(frames) == DATES
+    assert client.calls["open"] == 2
+
+
+def test_stale_days_are_served_while_another_caller_fetches(backend, limiter):
+    client = make_client()
+    store_stale(backend, client)
+    sheet_name, _ = app.daily_sheet_and_tab(START)
+    token = backend.try_lock(shared_cache.make_key("sheet_batch", sheet_name), 60)
+    calls = dict(client.calls)
+    frames, _, throttled = app.fetch_daily_range(client, DATES)
+    backend.release(shared_cache.make_key("sheet_batch", sheet_name), token)
+    assert sorted(frames) == DATES
+    assert not throttled
+    assert client.calls == calls
+
+
+def test_days_stored_by_the_lock_holder_are_not_refetched(backend, limiter, monkeypatch):
+    client = make_client()
+    fetched, _, _ = app.fetch_daily_range(client, DATES)
+    backend.clear()
+    sheet_name, _ = app.daily_sheet_and_tab(START)
+    lock_key = shared_cache.make_key("sheet_batch", sheet_name)
+    token = backend.try_lock(lock_key, 60)
+
+    def finish_other_fetch(seconds):
+        # Runs while fetch_daily_range waits for the lock, as another replica would.
+        for date, tab in fetched.items():
+            backend.set(sheet_key(date), tab, ttl=60)
+        backend.release(lock_key, token)
+
+    monkeypatch.setattr(app.time, "sleep", finish_other_fetch)
+    calls = dict(client.calls)
+    frames, _, _ = app.fetch_daily_range(client, DATES)
+    assert sorted(frames) == DATES
+    assert client.calls == calls
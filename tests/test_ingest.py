@@ -0,0 +1,88 @@
+import math
+
+import pytest
+
+import ingest
+
+
+def daily_records():
+    return [
+        {"DISTRICT": "Surat", "TALUKA": "Olpad", "TOTAL": 12.5},
+        {"DISTRICT": "Surat", "TALUKA": "Kamrej", "TOTAL": 0},
+    ]
+
+
+def hourly_records():
+    return [
+        {"District": "Surat", "Taluka": "Olpad", "06TO08": 1.5, "08TO10": 0, "Total_Rainfall": 1.5},
+        {"District": "Surat", "Taluka": "Kamrej", "06TO08": 0, "08TO10": 2, "Total_Rainfall": 2},
+    ]
+
+
+def test_aliases_are_renamed():
+    tab = ingest.ingest(daily_records(), ingest.DAILY)
+    assert list(tab.df.columns) == ["District", "Taluka", "Total_mm"]
+    assert tab.issues == []
+
+
+def test_rain_last_24_hrs_is_renamed_to_total():
+    records = [{"District": "Surat", "Taluka": "Olpad", "Rain_Last_24_Hrs": 4}]
+    tab = ingest.ingest(records, ingest.DAILY)
+    assert tab.df["Total_mm"].tolist() == [4]
+
+
+def test_alias_is_skipped_when_target_exists():
+    records = [{"District": "Surat", "Taluka": "Olpad", "Total_mm": 4, "TOTAL": 9}]
+    tab = ingest.ingest(records, ingest.DAILY)
+    assert tab.df["Total_mm"].tolist() == [4]
+    assert "TOTAL" in tab.df.columns
+
+
+def test_missing_required_columns_raise():
+    records = [{"District": "Surat", "Rain": 4}]
+    with pytest.raises(ingest.SchemaError, match="'Taluka', 'Total_mm'"):
+        ingest.ingest(records, ingest.DAILY)
+
+
+def test_hourly_tab_without_time_slots_raises():
+    records = [{"District": "Surat", "Taluka": "Olpad", "Total_Rainfall": 1}]
+    with pytest.raises(ingest.SchemaError, match="time slot"):
+        ingest.ingest(records, ingest.HOURLY)
+
+
+def test_hourly_time_slots_are_numeric():
+    records = hourly_records()
+    records[0]["08TO10"] = "0.5"
+    tab = ingest.ingest(records, ingest.HOURLY)
+    assert tab.df["08TO10"].tolist() == [0.5, 2]
+    assert tab.issues == []
+
+
+def test_non_numeric_values_are_reported_but_blanks_are_not():
+    records = daily_records() + [
+        {"DISTRICT": "Surat", "TALUKA": "Choryasi", "TOTAL": "n/a"},
+        {"DISTRICT": "Surat", "TALUKA": "Palsana", "TOTAL": ""},
+        {"DISTRICT": "Surat", "TALUKA": "Bardoli", "TOTAL": "  "},
+    ]
+    tab = ingest.ingest(records, ingest.DAILY)
+    assert tab.issues == ["1 non-numeric value(s) in 'Total_mm' treated as blank"]
+    assert tab.df["Total_mm"].tolist()[:2] == [12.5, 0]
+    assert all(math.isnan(value) for value in tab.df["Total_mm"].tolist()[2:])
+
+
+def test_empty_records_give_an_empty_tab():
+    tab = ingest.ingest([], ingest.DAILY)
+    assert tab.df.empty
+    assert tab.issues == []
+
+
+def test_same_records_give_the_same_content_hash():
+    first = ingest.ingest(daily_records(), ingest.DAILY)
+    second = ingest.ingest(daily_records(), ingest.DAILY)
+    assert first.content_hash == second.content_hash
+
+
+def test_changed_value_changes_the_content_hash():
+    records = daily_records()
+    records[1]["TOTAL"] = 0.1
+    assert ingest.ingest(records, ingest.DAILY).content_hash != ingest.ingest(daily_records(), ingest.DAILY).content_hash
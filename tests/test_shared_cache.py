@@ -0,0 +1,46 @@
+import perf_metrics
+import shared_cache
+
+PAST_RETENTION = -(shared_cache.STALE_RETENTION_SECONDS + 1)
+
+
+def test_memory_backend_keeps_stale_entries_within_retention():
+    memory = shared_cache.MemoryBackend()
+    memory.set("key", "value", ttl=-1)
+    entry = memory.get("key")
+    assert entry.value == "value"
+    assert not shared_cache.is_fresh(entry)
+
+
+def test_memory_backend_get_drops_entries_past_retention():
+    memory = shared_cache.MemoryBackend()
+    memory.set("key", "value", ttl=PAST_RETENTION)
+    assert memory.get("key") is None
+    assert "key" not in memory._entries
+
+
+def test_memory_backend_set_drops_entries_past_retention():
+    memory = shared_cache.MemoryBackend()
+    memory.set("old", "value", ttl=PAST_RETENTION)
+    memory.set("new", "value", ttl=60)
+    assert list(memory._entries) == ["new"]
+
+
+def test_memory_backend_evicts_least_recently_used():
+    memory = shared_cache.MemoryBackend(max_entries=2)
+    memory.set("a", 1, ttl=60)
+    memory.set("b", 2, ttl=60)
+    memory.get("a")
+    memory.set("c", 3, ttl=60)
+    assert memory.get("b") is None
+    assert memory.get("a").value == 1
+    assert memory.get("c").value == 3
+
+
+def test_get_or_compute_counts_lookups_and_misses_per_key_prefix(backend):
+    perf_metrics.registry.reset()
+    key = shared_cache.make_key("daily_model", "abc")
+    assert shared_cache.get_or_compute(key, lambda: "model", ttl=60) == "model"
+    assert shared_cache.get_or_compute(key, lambda: "other", ttl=60) == "model"
+    caches = perf_metrics.snapshot()["caches"]
+    assert caches["shared_daily_model"] == {"lookups": 2, "misses": 1, "hits": 1}
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+import shared_cache
+import sheets_access
+
+
+class Throttled(Exception):
+    code = 429
+
+
+def make_stale(backend, key, value):
+    backend.set(key, value, ttl=-1)
+
+
+def test_token_bucket_times_out_when_empty():
+    bucket = sheets_access.TokenBucket(rate=1, capacity=2)
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0.05)
+
+
+def test_token_bucket_refills_over_time():
+    bucket = sheets_access.TokenBucket(rate=50, capacity=1)
+    assert bucket.acquire(timeout=0)
+    start = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - start < 0.5
+
+
+def test_single_flight_shares_one_call():
+    flight = sheets_access.SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == ["value"] * 5
+
+
+def test_single_flight_shares_errors():
+    flight = sheets_access.SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert not flight.in_flight("key")
+
+
+def test_load_fetches_and_caches_on_miss(backend, limiter):
+    calls = []
+
+    def fetch(**options):
+        calls.append(options)
+        return "fresh"
+
+    first = sheets_access.load("k", fetch, ttl=60)
+    second = sheets_access.load("k", fetch, ttl=60)
+    assert (first.value, first.stale) == ("fresh", False)
+    assert (second.value, second.stale) == ("fresh", False)
+    assert len(calls) == 1
+
+
+def test_load_refreshes_stale_entry_with_one_attempt(backend, limiter):
+    make_stale(backend, "k", "old")
+    calls = []
+
+    def fetch(**options):
+        calls.append(options)
+        return "new"
+
+    result = sheets_access.load("k", fetch, ttl=60)
+    assert (result.value, result.stale) == ("new", False)
+    assert calls == [{"max_attempts": 1, "token_timeout": 0}]
+
+
+def test_load_serves_stale_without_waiting_for_a_refresh_in_progress(backend, limiter):
+    make_stale(backend, "k", "old")
+    # Another caller (a background revalidation or a replica in backoff) holds the lock.
+    token = backend.try_lock("k", 60)
+    try:
+        start = time.monotonic()
+        result = sheets_access.load("k", lambda **options: "new", ttl=60)
+        elapsed = time.monotonic() - start
+    finally:
+        backend.release("k", token)
+    assert (result.value, result.stale) == ("old", True)
+    assert elapsed < 0.5
+
+
+def test_load_serves_stale_and_revalidates_when_throttled(backend, limiter, monkeypatch):
+    monkeypatch.setattr(sheets_access, "backoff_delay", lambda attempt: 0)
+    make_stale(backend, "k", "old")
+    attempts = []
+
+    def fetch(max_attempts=sheets_access.MAX_ATTEMPTS, token_timeout=None):
+        attempts.append(max_attempts)
+        if len(attempts) == 1:
+            raise Throttled()
+        return "new"
+
+    result = sheets_access.load("k", fetch, ttl=60)
+    assert (result.value, result.stale) == ("old", True)
+
+    deadline = time.monotonic() + 2
+    while not shared_cache.is_fresh(backend.get("k")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend.get("k").value == "new"
+    assert attempts == [1, sheets_access.MAX_ATTEMPTS]
+
+
+def test_load_serves_stale_when_out_of_tokens(backend, monkeypatch):
+    monkeypatch.setattr(sheets_access, "limiter", sheets_access.TokenBucket(rate=0.001, capacity=0))
+    monkeypatch.setattr(sheets_access, "_revalidate_in_background", lambda *args: None)
+    make_stale(backend, "k", "old")
+    result = sheets_access.load("k", lambda **options: pytest.fail("should not fetch"), ttl=60)
+    assert (result.value, result.stale) == ("old", True)
+
+
+def test_load_raises_non_throttling_errors(backend, limiter):
+    make_stale(backend, "k", "old")
+
+    def fetch(**options):
+        raise KeyError("missing tab")
+
+    with pytest.raises(KeyError):
+        sheets_access.load("k", fetch, ttl=60)
+    assert backend.try_lock("k", 1) is not None
+
+
+def test_fetch_tabs_matches_fetch_records(limiter):
+    from benchmarks.fake_gspread import FakeGspreadClient
+
+    records = [
+        {"DISTRICT": "Kachchh", "TALUKA": "Bhuj", "TOTAL": 12.5, "06TO08": ""},
+        {"DISTRICT": "Surat", "TALUKA": "Olpad", "TOTAL": "1,234", "06TO08": 0},
+    ]
+    client = FakeGspreadClient({"sheet": {"tab": records, "other": records[:1]}})
+    single = sheets_access.fetch_records(client, "sheet", "tab")
+    batched = sheets_access.fetch_tabs(client, "sheet", ["tab", "missing"])
+    assert batched == {"tab": single}
+    assert client.calls["values_batch_get"] == 1